@@ -0,0 +1,97 @@
+import pygame
+import os
+from types import MappingProxyType
+
+from atlas import load_atlas, unpack_atlas
+
+# Assets already loaded, shared by every object that asks for the same file
+atlas_images = {}  # Subsurfaces of the sprite atlas by normalized path, filled on the first image load
+images = {}
+masks = {}
+animations = {}
+animation_masks = {}
+animation_silhouettes = {}
+sounds = {}
+
+# Stores the atlas read by the loader, so images are cut from it instead of being loaded
+def preload_atlas(data):
+  atlas_images.update(unpack_atlas(data))
+
+# Stores an image decoded by the loader, converting it for the display
+def preload_image(path, surf):
+  images[(path, False)] = surf.convert_alpha()
+
+# Stores a sound decoded by the loader at the given volume
+def preload_sound(path, volume, sound):
+  sound.set_volume(volume)
+  sounds[(path, volume)] = sound
+
+# Returns the image at the path, mirrored horizontally if flip is set, loading it the first time it is asked for.
+# Images packed into the sprite atlas are subsurfaces of it, any other image is loaded from its file
+def load_image(path, flip = False):
+  key = (path, flip)
+  if key not in images:
+    if flip:
+      images[key] = pygame.transform.flip(load_image(path), True, False)
+    else:
+      if not atlas_images:
+        atlas_images.update(load_atlas())
+      packed = atlas_images.get(os.path.normpath(path))
+      images[key] = packed if packed is not None else pygame.image.load(path).convert_alpha()
+  return images[key]
+
+# Returns the collision mask of the image at the path
+def load_mask(path, flip = False):
+  key = (path, flip)
+  if key not in masks:
+    masks[key] = pygame.mask.from_surface(load_image(path, flip))
+  return masks[key]
+
+# Returns a white copy of the surface's shape, drawn while an entity blinks
+def silhouette(mask):
+  white_surf = mask.to_surface().convert()
+  white_surf.set_colorkey((0, 0, 0))
+  return white_surf
+
+# Returns the animations found in the sub folders of the path, one tuple of frames per folder
+def load_animations(path):
+  if path not in animations:
+    frames = {}
+    for index, folder in enumerate(os.walk(path)):
+      if index == 0:
+        for name in folder[1]:
+          frames[name] = []
+      else:
+        for file_name in sorted(folder[2], key = lambda string: int(string.split('.')[0])):
+          file_path = folder[0].replace(os.sep, '/') + '/' + file_name
+          frames[os.path.basename(folder[0])].append(load_image(file_path))
+
+    # The animations are shared, so they are made read only
+    animations[path] = MappingProxyType({name: tuple(surfs) for name, surfs in frames.items()})
+  return animations[path]
+
+# Returns the sound at the path with the given volume, loading it the first time it is asked for
+def load_sound(path, volume = 1.0):
+  key = (path, volume)
+  if key not in sounds:
+    sounds[key] = pygame.mixer.Sound(path)
+    sounds[key].set_volume(volume)
+  return sounds[key]
+
+# Returns the collision masks of the animations at the path, one per frame
+def load_animation_masks(path):
+  if path not in animation_masks:
+    animation_masks[path] = MappingProxyType({
+      name: tuple(pygame.mask.from_surface(surf) for surf in surfs)
+      for name, surfs in load_animations(path).items()
+    })
+  return animation_masks[path]
+
+# Returns the white blink silhouettes of the animations at the path, one per frame
+def load_animation_silhouettes(path):
+  if path not in animation_silhouettes:
+    animation_silhouettes[path] = MappingProxyType({
+      name: tuple(silhouette(mask) for mask in frame_masks)
+      for name, frame_masks in load_animation_masks(path).items()
+    })
+  return animation_silhouettes[path]
@@ -0,0 +1,63 @@
+import pygame
+import os
+
+from settings import *
+from cache import source_stamps, read_cache, write_cache
+
+ATLAS_VERSION = 1  # Bump whenever the layout of the cached atlas changes
+
+# Packs surfaces into one atlas row by row, returning the atlas and the rect of each surface
+def pack_atlas(surfaces, width = 2048):
+  rects = {}
+  x, y, row_height = 0, 0, 0
+  for key, surf in sorted(surfaces.items(), key = lambda item: -item[1].get_height()):
+    if x + surf.get_width() > width:
+      x, y = 0, y + row_height
+      row_height = 0
+    rects[key] = (x, y, surf.get_width(), surf.get_height())
+    x += surf.get_width()
+    row_height = max(row_height, surf.get_height())
+
+  atlas = pygame.Surface((width, max(y + row_height, 1)), pygame.SRCALPHA)
+  for key, surf in surfaces.items():
+    atlas.blit(surf, rects[key][:2])
+  return atlas, rects
+
+# Returns the PNG files at the paths, looking through folders, in a stable order
+def find_images(paths):
+  images = []
+  for path in paths:
+    if os.path.isdir(path):
+      for folder, _, file_names in os.walk(path):
+        images.extend(os.path.normpath(os.path.join(folder, name)) for name in file_names if name.endswith('.png'))
+    elif os.path.exists(path):
+      images.append(os.path.normpath(path))
+  return sorted(images)
+
+# Loads and packs the images into plain data that can be pickled
+def build_atlas(sources):
+  atlas, rects = pack_atlas({source: pygame.image.load(source) for source in sources})
+  return {
+    'version': ATLAS_VERSION,
+    'atlas': pygame.image.tobytes(atlas, 'RGBA'), 'atlas_size': atlas.get_size(),
+    'rects': rects, 'sources': source_stamps(sources)
+  }
+
+# Returns the packed atlas data of the images at the paths, repacking only when an image was added, removed or changed.
+# It never touches the display, so it can run on a loader thread
+def read_atlas(paths = SPRITE_ATLAS_PATHS, cache_path = SPRITE_ATLAS_CACHE):
+  sources = find_images(paths)
+  data = read_cache(cache_path, ATLAS_VERSION)
+  if data is None or [stamp[0] for stamp in data['sources']] != sources:
+    data = build_atlas(sources)
+    write_cache(cache_path, data)
+  return data
+
+# Returns a subsurface of the atlas for every packed image, keyed by normalized path
+def unpack_atlas(data):
+  atlas = pygame.image.frombytes(data['atlas'], data['atlas_size'], 'RGBA').convert_alpha()
+  return {source: atlas.subsurface(rect) for source, rect in data['rects'].items()}
+
+# Returns a subsurface of one packed atlas for every image at the paths
+def load_atlas(paths = SPRITE_ATLAS_PATHS, cache_path = SPRITE_ATLAS_CACHE):
+  return unpack_atlas(read_atlas(paths, cache_path))
@@ -0,0 +1,68 @@
+import pygame
+from settings import *
+from assets import load_sound
+from profiler import profiler
+
+# AudioManager class for playing the game's sounds on a limited number of reserved mixer channels.
+# Each sound has its own channels, when they are all busy the least important voice is stolen
+class AudioManager:
+  def __init__(self):
+    self.enabled = False  # Nothing is loaded or played while this is off
+    self.sounds = {}  # Shared buffer of each sound
+    self.voices = {}  # Channel, priority and distance of each voice of each sound
+    self.listener = pygame.math.Vector2()  # Position the distance of a sound is measured from
+
+  # Loads the sounds and reserves their channels, the manager stays muted without a mixer
+  def start(self, enabled = True):
+    self.enabled = enabled and pygame.mixer.get_init() is not None
+    if not self.enabled:
+      return
+
+    # The reserved channels come first. At least one more is kept unreserved for sounds played outside the manager,
+    # since Sound.play only picks unreserved channels. The music streams through pygame.mixer.music and needs none
+    reserved = sum(voices for _, _, voices in AUDIO_SOUNDS.values())
+    pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), reserved + 1))
+    pygame.mixer.set_reserved(reserved)
+
+    first = 0
+    for name, (path, volume, voices) in AUDIO_SOUNDS.items():
+      self.sounds[name] = load_sound(path, volume)
+      self.voices[name] = [[pygame.mixer.Channel(first + index), 0, 0.0] for index in range(voices)]
+      first += voices
+
+  # Moves the position sounds are heard from, usually the center of the camera
+  def listen(self, pos):
+    self.listener.update(pos)
+
+  # Plays a sound made at the position. A higher priority keeps the sound from being stolen by less important ones,
+  # and between voices of the same priority the one furthest from the listener is stolen first
+  def play(self, name, pos, priority = 0):
+    if not self.enabled:
+      return
+
+    distance = self.listener.distance_to(pos)
+    if distance > AUDIO_HEARING_DISTANCE:
+      profiler.count('sounds dropped')
+      return
+
+    voices = self.voices[name]
+    voice = next((voice for voice in voices if not voice[0].get_busy()), None)
+    if voice is None:
+      # Steal the least important voice, as long as the new sound is more important than it
+      voice = min(voices, key = lambda voice: (voice[1], -voice[2]))
+      if (priority, -distance) <= (voice[1], -voice[2]):
+        profiler.count('sounds dropped')
+        return
+      profiler.count('voices stolen')
+
+    volume = 1.0
+    if distance > AUDIO_FULL_VOLUME_DISTANCE:
+      volume = 1 - (distance - AUDIO_FULL_VOLUME_DISTANCE) / (AUDIO_HEARING_DISTANCE - AUDIO_FULL_VOLUME_DISTANCE)
+
+    voice[0].play(self.sounds[name])
+    voice[0].set_volume(volume)
+    voice[1] = priority
+    voice[2] = distance
+
+# Audio manager shared by the whole game, muted until the game starts it
+audio = AudioManager()
@@ -0,0 +1,91 @@
+import argparse, itertools, json, statistics
+from concurrent.futures import ProcessPoolExecutor
+
+from settings import *
+
+# Parses a sweep like 'enemy.cooldown=800,1000' into the kind, attribute and values to try
+def parse_sweep(text):
+  target, values = text.split('=')
+  kind, name = target.split('.')
+  return kind, name, [json.loads(value) for value in values.split(',')]
+
+# Returns every combination of the swept values as a config for Game
+def build_configs(sweeps):
+  configs = []
+  for values in itertools.product(*(values for _, _, values in sweeps)):
+    config = {}
+    for (kind, name, _), value in zip(sweeps, values):
+      config.setdefault(kind, {})[name] = value
+    configs.append(config)
+  return configs
+
+# Runs one game without a window and returns how it went, this runs inside a worker process
+def run_simulation(job):
+  from main import Game
+  from controls import RandomInput, ReplayInput
+
+  input_source = ReplayInput(job['replay']) if job['replay'] else RandomInput(job['seed'])
+  game = Game(headless = True, input_source = input_source, config = job['config'])
+  start_health = game.player.health
+  frames = game.run_headless(job['frames'])
+
+  killed = len(game.streamer.dead_enemies) + sum(
+    1 for enemies in game.streamer.loaded_enemies.values() for _, enemy in enemies if not enemy.alive()
+  )
+  return {
+    'config': job['config'],
+    'seed': job['seed'],
+    'frames': frames,
+    'survival_time': frames * FIXED_DT,
+    'damage_taken': start_health - max(game.player.health, 0),
+    'died': game.over,
+    'enemies_killed': killed
+  }
+
+# Averages the results of the runs of each config
+def summarize(results):
+  summary = []
+  for config, runs in itertools.groupby(results, key = lambda result: json.dumps(result['config'], sort_keys = True)):
+    runs = list(runs)
+    summary.append({
+      'config': runs[0]['config'],
+      'runs': len(runs),
+      'survival_time': statistics.mean(run['survival_time'] for run in runs),
+      'damage_taken': statistics.mean(run['damage_taken'] for run in runs),
+      'death_rate': sum(run['died'] for run in runs) / len(runs),
+      'enemies_killed': statistics.mean(run['enemies_killed'] for run in runs),
+      'frames': statistics.mean(run['frames'] for run in runs)
+    })
+  return summary
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description = 'Run many games without a window in parallel and compare the results')
+  parser.add_argument('--sweep', action = 'append', default = [], metavar = 'KIND.ATTR=V1,V2', help = 'values to try for a player or enemy attribute, e.g. enemy.cooldown=800,1000')
+  parser.add_argument('--runs', type = int, default = 4, help = 'number of seeds to run per combination')
+  parser.add_argument('--seed', type = int, default = 0, help = 'first seed of the random input')
+  parser.add_argument('--frames', type = int, default = 3600, help = 'maximum number of fixed steps per run')
+  parser.add_argument('--replay', metavar = 'FILE', help = 'use a recorded input file instead of random input')
+  parser.add_argument('--workers', type = int, default = None, help = 'number of worker processes, all cores by default')
+  parser.add_argument('--output', metavar = 'FILE', help = 'write every run and the summary to a JSON file')
+  args = parser.parse_args()
+
+  configs = build_configs([parse_sweep(text) for text in args.sweep])
+  jobs = [
+    {'config': config, 'seed': args.seed + run, 'frames': args.frames, 'replay': args.replay}
+    for config in configs for run in range(args.runs)
+  ]
+
+  with ProcessPoolExecutor(max_workers = args.workers) as executor:
+    results = list(executor.map(run_simulation, jobs))
+  summary = summarize(results)
+
+  for row in summary:
+    print(
+      f"{json.dumps(row['config'], sort_keys = True)}: survived {row['survival_time']:.1f}s, "
+      f"took {row['damage_taken']:.1f} damage, died in {row['death_rate']:.0%} of {row['runs']} runs, "
+      f"killed {row['enemies_killed']:.1f} enemies"
+    )
+
+  if args.output:
+    with open(args.output, 'w') as file:
+      json.dump({'runs': results, 'summary': summary}, file, indent = 2)
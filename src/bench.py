@@ -0,0 +1,159 @@
+import argparse, json, statistics, sys, timeit
+import pygame
+from collections import deque
+
+from settings import *
+from main import Game
+from controls import ReplayInput, RandomInput
+from profiler import profiler
+from level import LevelObject
+from snapshot import capture_snapshot, restore_snapshot
+
+PHASES = ('update', 'platform_collisions', 'bullet_collisions', 'draw', 'overlay')
+PERCENTILES = {'p50': 49, 'p95': 94, 'p99': 98}  # Index of each percentile in statistics.quantiles
+
+# Returns the p50, p95 and p99 of each phase in milliseconds
+def summarize(history):
+  results = {}
+  for phase in PHASES:
+    samples = [frame['timings'].get(phase, 0.0) for frame in history]
+    quantiles = statistics.quantiles(samples, n = 100, method = 'inclusive')
+    results[phase] = {name: round(quantiles[index], 4) for name, index in PERCENTILES.items()}
+  return results
+
+# Replays a recorded session against the real map, drawing every frame, and returns the phase times
+def run_benchmark(path):
+  replay = ReplayInput(path)
+  game = Game(headless = True, input_source = replay)
+
+  # Every frame is kept, and sprite updates are timed as one phase to keep the profiling cost flat
+  profiler.enabled = True
+  profiler.per_class = False
+  profiler.history = deque(maxlen = None)
+
+  while not replay.finished and not game.over:
+    game.step(FIXED_DT)
+    game.draw()
+    profiler.end_frame()
+  if game.over:
+    print(f'The player died after {replay.index} of {len(replay.frames)} frames')
+
+  return summarize(profiler.history)
+
+# Adds enemies to the region the player is in as extra spawns, so they are captured like every other enemy
+def add_enemies(game, count):
+  streamer = game.streamer
+  key = streamer.center
+  first = max(streamer.spawn_objects, default = 0) + 1
+  for index in range(count):
+    x = key[0] * streamer.region_size + index * 37 % streamer.region_size
+    obj = LevelObject(first + index, 'Enemy', x, game.player.rect.top, 0, 0, None)
+    streamer.spawns.setdefault(key, []).append(obj)
+    streamer.spawn_objects[obj.id] = obj
+  streamer.evict_enemies(key)
+  streamer.load_enemies(key)
+
+# Returns the size of a snapshot and the microseconds it takes to capture and restore one,
+# as more enemies and bullets are added to the same world
+def run_snapshot_benchmark(counts, number = 200):
+  game = Game(headless = True, input_source = RandomInput(0))
+  for _ in range(120):
+    game.step(FIXED_DT)
+
+  results = []
+  added = 0
+  for count in counts:
+    add_enemies(game, count - added)
+    for index in range(count - added):
+      game.bullets.spawn((game.player.rect.centerx + index, game.player.rect.top - 200), pygame.math.Vector2(1, 0))
+    added = count
+
+    data = capture_snapshot(game)
+    capture = timeit.timeit(lambda: capture_snapshot(game), number = number) / number
+    restore = timeit.timeit(lambda: restore_snapshot(game, data), number = number) / number
+    results.append((len(game.enemy_sprites), game.bullets.count, len(data), capture * 1e6, restore * 1e6))
+  return results
+
+# Returns how far a bullet travels in the duration at each of the frame times, passing through a target
+# the size of the player whose mask is empty, like the space above a ducking player. Every distance should be the same
+def run_bullet_travel_check(dts, duration = 0.6):
+  game = Game(headless = True, input_source = RandomInput(0))
+  bullets = game.bullets
+  target = pygame.sprite.Sprite()
+  target.rect = game.player.rect.copy()
+  target.mask = pygame.mask.Mask(target.rect.size)
+
+  # The bullet starts left of the target, in a row of the level with nothing solid in the way
+  travel = bullets.speed * duration
+  start = pygame.math.Vector2(target.rect.left - travel / 2, target.rect.centery)
+  path = pygame.Rect(start.x - bullets.width, start.y - bullets.height, travel + 2 * bullets.width, 2 * bullets.height)
+  rows = slice(path.top // bullets.tile_size, path.bottom // bullets.tile_size + 1)
+  cols = slice(path.left // bullets.tile_size, path.right // bullets.tile_size + 1)
+  if bullets.solid[rows, cols].any():
+    target.rect.y = start.y = bullets.tile_size // 2 - target.rect.height // 2
+
+  results = []
+  for dt in dts:
+    bullets.count = 0
+    bullets.spawn(start, pygame.math.Vector2(1, 0))
+    for _ in range(round(duration / dt)):
+      bullets.update(dt, (), [target])
+    results.append((dt, bullets.pos[0][0] - start.x))
+  return results
+
+# Returns the phases and percentiles that got slower than the baseline allows
+def find_regressions(results, baseline, tolerance, min_delta):
+  regressions = []
+  for phase, percentiles in results.items():
+    for name, value in percentiles.items():
+      expected = baseline.get(phase, {}).get(name)
+      if expected is not None and value > expected * (1 + tolerance) and value - expected > min_delta:
+        regressions.append((phase, name, expected, value))
+  return regressions
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser(description = 'Replay a recorded session and report frame times per phase')
+  parser.add_argument('recording', nargs = '?', help = 'input recording made with main.py --record')
+  parser.add_argument('--baseline', metavar = 'FILE', help = 'JSON file with the timings to compare against')
+  parser.add_argument('--save-baseline', action = 'store_true', help = 'write the timings of this run to the baseline file')
+  parser.add_argument('--tolerance', type = float, default = 0.25, help = 'allowed slowdown as a fraction of the baseline')
+  parser.add_argument('--min-delta', type = float, default = 0.05, help = 'slowdowns under this many milliseconds are ignored')
+  parser.add_argument('--snapshots', action = 'store_true', help = 'measure world snapshots as the number of enemies and bullets grows instead')
+  parser.add_argument('--bullet-travel', action = 'store_true', help = 'check that bullets travel as far at every frame rate instead')
+  args = parser.parse_args()
+
+  if args.snapshots:
+    print(f'{"enemies":>8}{"bullets":>9}{"bytes":>9}{"capture":>10}{"restore":>10}  (us)')
+    for enemies, bullets, size, capture, restore in run_snapshot_benchmark((0, 25, 50, 100, 200, 400)):
+      print(f'{enemies:>8}{bullets:>9}{size:>9}{capture:>10.1f}{restore:>10.1f}')
+    sys.exit()
+  if args.bullet_travel:
+    results = run_bullet_travel_check((1 / 240, 1 / 120, 1 / 60, 1 / 30, 1 / 15, 1 / 10))
+    expected = results[0][1]
+    for dt, distance in results:
+      print(f'{1 / dt:>6.0f} FPS: {distance:.1f} px')
+    if any(abs(distance - expected) > 1 for _, distance in results):
+      print('Bullets travel a different distance depending on the frame time')
+      sys.exit(1)
+    sys.exit()
+  if not args.recording:
+    parser.error('a recording is needed unless --snapshots or --bullet-travel is given')
+
+  results = run_benchmark(args.recording)
+  print(f'{"phase":<22}{"p50":>10}{"p95":>10}{"p99":>10}  (ms)')
+  for phase, percentiles in results.items():
+    print(f'{phase:<22}' + ''.join(f'{value:>10.3f}' for value in percentiles.values()))
+
+  if args.baseline and args.save_baseline:
+    with open(args.baseline, 'w') as file:
+      json.dump(results, file, indent = 2)
+    print(f'Baseline written to {args.baseline}')
+  elif args.baseline:
+    with open(args.baseline) as file:
+      baseline = json.load(file)
+    regressions = find_regressions(results, baseline, args.tolerance, args.min_delta)
+    for phase, name, expected, value in regressions:
+      print(f'REGRESSION {phase} {name}: {value:.3f} ms, baseline {expected:.3f} ms')
+    if regressions:
+      sys.exit(1)
+    print('No regressions against the baseline')
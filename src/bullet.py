@@ -1,49 +1,204 @@
 import pygame
+import numpy as np
+from math import ceil
 from settings import *
-
-# Bullet class for creating and managing a bullet object
-class Bullet(pygame.sprite.Sprite):
-  def __init__(self, pos, surf, direction, groups):
-    super().__init__(groups)
-    self.image = surf  # Image of the bullet
-
-    # Flips the image of the bullet if the direction is negative
-    if direction.x < 0:
-      self.image = pygame.transform.flip(self.image, True, False)
-
-    # Position and layer of the bullet
-    self.rect = self.image.get_rect(center = pos)
-    self.z = LAYERS['Level']
-
-    # Direction and speed of the bullet
-    self.direction = direction
-    self.speed = 1200
-    self.pos = pygame.math.Vector2(self.rect.center)
-
-    # Time of bullet creation
-    self.start_time = pygame.time.get_ticks()
-    self.mask = pygame.mask.from_surface(self.image)
-
-  # Updates the position of the bullet
-  def update(self, dt):
-    self.pos += self.direction * self.speed * dt
-    self.rect.center = (round(self.pos.x), round(self.pos.y))
-
-    # Removes the bullet after a second
-    if pygame.time.get_ticks() - self.start_time > 1000:
-      self.kill()
-
-
-# FireAnimation class for creating and managing a fire animation
+from clock import sim_clock
+from profiler import profiler
+
+# BulletSystem class for moving, colliding and drawing every live bullet at once
+class BulletSystem:
+  def __init__(self, level, surfs, masks, capacity = BULLET_CAPACITY):
+    self.surfs = surfs  # Image of a bullet for each direction, keyed by whether it is flipped
+    self.masks = masks  # Collision mask for each direction
+    self.z = LAYERS['Level']  # Layer of the bullets
+    self.speed = 1200  # Speed of a bullet
+    self.lifetime = 1000  # Time in milliseconds before a bullet is removed
+    self.width, self.height = surfs[False].get_size()
+
+    # Solid cells of the level, bullets are checked against them instead of the tile sprites
+    self.tile_size = level.tile_width
+    self.solid = np.array(level.layers['Level'], dtype = np.uint32).reshape(level.height, level.width) != 0
+
+    # State of the live bullets, stored in the first count slots of each array
+    self.count = 0
+    self.pos = np.zeros((capacity, 2))  # Center of each bullet
+    self.velocity = np.zeros((capacity, 2))
+    self.start_time = np.zeros(capacity)  # Time each bullet was fired
+    self.flip = np.zeros(capacity, dtype = bool)  # Whether each bullet faces left
+
+  # Doubles the size of the state arrays when they are full
+  def grow(self):
+    capacity = len(self.pos) * 2
+    for name in ('pos', 'velocity', 'start_time', 'flip'):
+      array = getattr(self, name)
+      grown = np.zeros((capacity,) + array.shape[1:], dtype = array.dtype)
+      grown[:self.count] = array[:self.count]
+      setattr(self, name, grown)
+
+  # Fires a new bullet from the position in the direction
+  def spawn(self, pos, direction):
+    if self.count == len(self.pos):
+      self.grow()
+
+    index = self.count
+    self.pos[index] = pos
+    self.velocity[index] = (direction.x * self.speed, direction.y * self.speed)
+    self.start_time[index] = sim_clock.get_ticks()
+    self.flip[index] = direction.x < 0
+    self.count += 1
+
+  # Keeps only the bullets selected by the mask, packing them at the start of the arrays
+  def keep(self, alive):
+    count = int(np.count_nonzero(alive))
+    for name in ('pos', 'velocity', 'start_time', 'flip'):
+      array = getattr(self, name)
+      array[:count] = array[:self.count][alive]
+    self.count = count
+
+  # Returns the left, top, right and bottom of every bullet rect, rounded like a sprite rect
+  def rects(self):
+    centers = np.round(self.pos[:self.count]).astype(np.int64)
+    left = centers[:, 0] - self.width // 2
+    top = centers[:, 1] - self.height // 2
+    return left, top, left + self.width, top + self.height
+
+  # Returns which bullets overlap a rect
+  def overlapping(self, rect, rects):
+    left, top, right, bottom = rects
+    return (left < rect.right) & (right > rect.left) & (top < rect.bottom) & (bottom > rect.top)
+
+  # Returns which bullets touch a solid cell of the level, bullets are never bigger than a cell
+  def hits_level(self, rects):
+    left, top, right, bottom = rects
+    rows, cols = self.solid.shape
+    hits = np.zeros(self.count, dtype = bool)
+    for x in (left, right - 1):
+      for y in (top, bottom - 1):
+        col = x // self.tile_size
+        row = y // self.tile_size
+        inside = (col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+        hits[inside] |= self.solid[row[inside], col[inside]]
+    return hits
+
+  # Returns which bullets overlap the rect of any of the sprites
+  def touching(self, sprites, rects):
+    touching = np.zeros(self.count, dtype = bool)
+    for sprite in sprites:
+      touching |= self.overlapping(sprite.rect, rects)
+    return touching
+
+  # Returns the indexes of the bullets whose mask overlaps the sprite's mask
+  def mask_hits(self, sprite, rects):
+    candidates = np.flatnonzero(self.overlapping(sprite.rect, rects))
+    profiler.count('collision checks', self.count)
+    return [
+      index for index in candidates
+      if sprite.mask.overlap(self.masks[bool(self.flip[index])], (int(rects[0][index]) - sprite.rect.left, int(rects[1][index]) - sprite.rect.top))
+    ]
+
+  # Returns which bullets overlap the mask of any of the sprites
+  def hitting(self, sprites, rects):
+    hitting = np.zeros(self.count, dtype = bool)
+    for sprite in sprites:
+      hitting[self.mask_hits(sprite, rects)] = True
+    return hitting
+
+  # Removes the bullets that are too old. Bullets are stored in the order they were fired and all live
+  # equally long, so the expired ones are always the first few and a binary search finds them
+  def expire(self):
+    expired = int(np.searchsorted(self.start_time[:self.count], sim_clock.get_ticks() - self.lifetime))
+    if expired:
+      for name in ('pos', 'velocity', 'start_time', 'flip'):
+        array = getattr(self, name)
+        array[:self.count - expired] = array[expired:self.count]
+      self.count -= expired
+
+  # Moves every bullet and removes the ones that are too old. When a bullet would travel further than
+  # MAX_STEP_DISTANCE the move is split into substeps, and a bullet stops at the first substep where it
+  # touches the level or a blocker, or the mask of a target, so collide still finds it there instead of on the far side.
+  # Only a hit stops a bullet, one passing through the empty parts of a target's rect keeps its full speed
+  def update(self, dt, blockers = (), targets = ()):
+    if not self.count:
+      return
+
+    distance = self.speed * dt
+    steps = min(MAX_SUBSTEPS, max(1, ceil(distance / MAX_STEP_DISTANCE)))
+    if steps == 1:
+      self.pos[:self.count] += self.velocity[:self.count] * dt
+    else:
+      step = self.velocity[:self.count] * (dt / steps)
+      moving = np.ones(self.count, dtype = bool)
+      for _ in range(steps):
+        self.pos[:self.count][moving] += step[moving]
+        rects = self.rects()
+        moving &= ~(self.hits_level(rects) | self.touching(blockers, rects) | self.hitting(targets, rects))
+        if not moving.any():
+          break
+      profiler.count('bullet substeps', steps)
+    self.expire()
+
+  # Removes the bullets that hit the level or a platform, and damages the sprites they hit
+  def collide(self, platform_sprites, vulnerable_sprites):
+    if not self.count:
+      return
+
+    rects = self.rects()
+    hits = self.hits_level(rects)
+    profiler.count('collision checks', self.count)
+    hits |= self.touching(platform_sprites, rects)
+    if hits.any():
+      self.keep(~hits)
+      rects = self.rects()
+
+    for sprite in vulnerable_sprites.sprites():
+      if not self.count:
+        break
+      hit = self.mask_hits(sprite, rects)
+      if hit:
+        alive = np.ones(self.count, dtype = bool)
+        alive[hit] = False
+        self.keep(alive)
+        rects = self.rects()
+        sprite.damage()
+
+  # Returns the screen rects of the bullets that are inside the camera
+  def dirty_rects(self, offset, camera_rect):
+    if not self.count:
+      return []
+
+    rects = self.rects()
+    visible = np.flatnonzero(self.overlapping(camera_rect, rects))
+    return [
+      pygame.Rect(int(rects[0][index] - offset.x), int(rects[1][index] - offset.y), self.width, self.height)
+      for index in visible
+    ]
+
+  # Draws the bullets that are inside the camera
+  def draw(self, surface, offset, camera_rect):
+    if not self.count:
+      return
+
+    rects = self.rects()
+    visible = np.flatnonzero(self.overlapping(camera_rect, rects))
+    profiler.count('blits', len(visible))
+    surface.blits([
+      (self.surfs[bool(self.flip[index])], (rects[0][index] - offset.x, rects[1][index] - offset.y))
+      for index in visible
+    ], doreturn = False)
+
+
+# FireAnimation class for creating and managing a fire animation, recycled through a pool
 class FireAnimation(pygame.sprite.Sprite):
-  def __init__(self, entity, surf_list, direction, groups):
-    super().__init__(groups)
+  def __init__(self, pool):
+    super().__init__()
+    self.pool = pool  # Pool the animation goes back to when it ends
+    self.z = LAYERS['Level']  # Layer of the fire animation
+    self.offset = pygame.math.Vector2()
+
+  # Sets the animation up for a new shot
+  def reset(self, entity, surf_list, direction):
     self.entity = entity  # Entity on which the fire animation is applied
-    self.frames = surf_list  # List of images for the fire animation
-
-    # Flips the fire animation if the direction is negative
-    if direction.x < 0:
-      self.frames = [pygame.transform.flip(frame, True, False) for frame in self.frames]
+    self.frames = surf_list  # List of images for the fire animation, already facing the direction
 
     # Setting the initial frame
     self.frame_index = 0
@@ -52,11 +207,15 @@ class FireAnimation(pygame.sprite.Sprite):
     # Setting the offset for the fire animation
     x_offset = 60 if direction.x > 0 else -60
     y_offset = 10 if entity.duck else -16
-    self.offset = pygame.math.Vector2(x_offset, y_offset)
+    self.offset.update(x_offset, y_offset)
 
-    # Position and layer of the fire animation
+    # Position of the fire animation
     self.rect = self.image.get_rect(center = self.entity.rect.center + self.offset)
-    self.z = LAYERS['Level']
+
+  # Removes the animation from its groups and gives it back to the pool
+  def kill(self):
+    super().kill()
+    self.pool.release(self)
 
   # Animates the fire
   def animate(self, dt):
@@ -0,0 +1,42 @@
+import os, pickle, hashlib
+
+# Returns the hash of a file's contents
+def file_hash(path):
+  with open(path, 'rb') as file:
+    return hashlib.sha1(file.read()).hexdigest()
+
+# Returns the modification time and hash of every source file
+def source_stamps(sources):
+  return [(source, os.stat(source).st_mtime_ns, file_hash(source)) for source in sources]
+
+# Checks that the cached source files are unchanged, comparing the hash only when the mtime differs
+def cache_is_valid(stamps):
+  for source, mtime, digest in stamps:
+    if not os.path.exists(source):
+      return False
+    if os.stat(source).st_mtime_ns != mtime and file_hash(source) != digest:
+      return False
+  return True
+
+# Returns the data cached at the path, or None when it is missing, of another version or built from changed sources
+def read_cache(path, version):
+  try:
+    with open(path, 'rb') as file:
+      data = pickle.load(file)
+    if data['version'] == version and cache_is_valid(data['sources']):
+      return data
+  except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+    pass
+  return None
+
+# Writes data to the cache at the path
+def write_cache(path, data):
+  # The cache is written to a temporary file first so parallel runs never read half a cache
+  try:
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as file:
+      pickle.dump(data, file, protocol = pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+  except OSError:
+    pass  # The game still runs without a cache, it just rebuilds the data every time
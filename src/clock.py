@@ -0,0 +1,24 @@
+from math import sin
+
+# SimulationClock class for the time the game logic reads, advanced by the game loop instead of the wall clock
+class SimulationClock:
+  def __init__(self):
+    self.time = 0.0  # Simulated time in milliseconds
+    self.wave = True  # Whether blinking sprites show their silhouette, worked out once per step
+
+  # Moves the clock forward by dt seconds
+  def advance(self, dt):
+    self.time += dt * 1000
+    self.wave = sin(self.get_ticks()) >= 0
+
+  # Sets the clock back to zero for a new game
+  def reset(self):
+    self.time = 0.0
+    self.wave = True
+
+  # Returns the simulated time in whole milliseconds, like pygame.time.get_ticks
+  def get_ticks(self):
+    return int(self.time)
+
+# Clock shared by every object of the running game
+sim_clock = SimulationClock()
@@ -0,0 +1,126 @@
+import pygame
+import struct, random
+
+# Keys the game reads, each stored as one bit of a frame's key state
+KEY_BITS = {
+  pygame.K_RIGHT: 1,
+  pygame.K_LEFT: 2,
+  pygame.K_UP: 4,
+  pygame.K_DOWN: 8,
+  pygame.K_SPACE: 16
+}
+
+HEADER = struct.Struct('<4sBI')  # Magic, version and number of frames of a recording
+FRAME = struct.Struct('<Bf')  # Key bits and dt of one recorded frame
+MAGIC = b'CRIN'
+VERSION = 1
+
+# KeyState class for the keys held during one frame, indexed like pygame.key.get_pressed
+class KeyState:
+  def __init__(self, bits = 0):
+    self.bits = bits
+
+  def __getitem__(self, key):
+    return bool(self.bits & KEY_BITS.get(key, 0))
+
+# KeyboardInput class for reading the keys from the keyboard
+class KeyboardInput:
+  def __init__(self):
+    self.keys = KeyState()
+
+  # Reads the keys held this frame and returns the dt the frame should use
+  def read(self, dt):
+    pressed = pygame.key.get_pressed()
+    self.keys = KeyState(sum(bit for key, bit in KEY_BITS.items() if pressed[key]))
+    return dt
+
+  # Returns the keys held this frame
+  def get_pressed(self):
+    return self.keys
+
+  def close(self):
+    pass
+
+# RecordingInput class for logging the keys of another input source to a file
+class RecordingInput:
+  def __init__(self, source, path):
+    self.source = source  # Input source being recorded
+    self.path = path  # File the recording is written to
+    self.frames = []
+
+  # Reads and logs the keys, the dt is rounded the way it is stored so a replay matches exactly
+  def read(self, dt):
+    dt = FRAME.unpack(FRAME.pack(0, self.source.read(dt)))[1]
+    self.frames.append((self.source.get_pressed().bits, dt))
+    return dt
+
+  def get_pressed(self):
+    return self.source.get_pressed()
+
+  # Writes the recording to its file
+  def close(self):
+    with open(self.path, 'wb') as file:
+      file.write(HEADER.pack(MAGIC, VERSION, len(self.frames)))
+      for bits, dt in self.frames:
+        file.write(FRAME.pack(bits, dt))
+
+# ReplayInput class for playing back a recording frame by frame
+class ReplayInput:
+  def __init__(self, path):
+    with open(path, 'rb') as file:
+      data = file.read()
+
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+      raise ValueError(f'{path} is not a version {VERSION} input recording')
+    self.frames = [FRAME.unpack_from(data, HEADER.size + index * FRAME.size) for index in range(count)]
+    self.index = 0  # Next frame to play
+    self.keys = KeyState()
+
+  # Whether every recorded frame has been played
+  @property
+  def finished(self):
+    return self.index >= len(self.frames)
+
+  # Plays the next recorded frame and returns the dt it was recorded with
+  def read(self, dt):
+    if self.finished:
+      self.keys = KeyState()
+      return dt
+
+    bits, dt = self.frames[self.index]
+    self.keys = KeyState(bits)
+    self.index += 1
+    return dt
+
+  def get_pressed(self):
+    return self.keys
+
+  def close(self):
+    pass
+
+# RandomInput class for pressing keys at random, the same way every time for the same seed
+class RandomInput:
+  def __init__(self, seed):
+    self.random = random.Random(seed)
+    self.keys = KeyState()
+    self.hold = 0  # Frames left before new keys are picked
+
+  # Holds a random set of keys for a random number of frames
+  def read(self, dt):
+    if self.hold <= 0:
+      # Moving right is picked twice as often as left or standing, so runs tend to go through the level
+      bits = self.random.choice((KEY_BITS[pygame.K_RIGHT], KEY_BITS[pygame.K_RIGHT], KEY_BITS[pygame.K_LEFT], 0))
+      for key in (pygame.K_UP, pygame.K_DOWN, pygame.K_SPACE):
+        if self.random.random() < 0.3:
+          bits |= KEY_BITS[key]
+      self.keys = KeyState(bits)
+      self.hold = self.random.randint(5, 60)
+    self.hold -= 1
+    return dt
+
+  def get_pressed(self):
+    return self.keys
+
+  def close(self):
+    pass
@@ -2,17 +2,20 @@ import pygame
 
 from settings import *
 from entity import Entity
+from quality import quality
+from audio import audio
 
 # Enemy class for creating and managing an enemy
 class Enemy(Entity):
+  cooldown = 1000  # Cooldown for the enemy attack
+
   def __init__(self, pos, path, groups, shoot, player, collision_sprites):
     super().__init__(pos, path, groups, shoot)
     self.player = player  # Player to attack
     # Check if the enemy is colliding with any other sprite
-    for sprite in collision_sprites.sprites():
+    for sprite in collision_sprites.query(pygame.Rect(self.rect.midbottom, (1, 1))):
       if sprite.rect.collidepoint(self.rect.midbottom):
         self.rect.bottom = sprite.rect.top
-    self.cooldown = 1000  # Cooldown for the enemy attack
     self.health = 3  # Health of the enemy
 
   # Gets the status of the enemy based on the player's position
@@ -22,34 +25,51 @@ class Enemy(Entity):
     else:
       self.status = 'right'
 
+  # Checks if the player is close enough for the enemy to act, the region is the camera plus a margin
+  def is_awake(self):
+    dx = abs(self.player.rect.centerx - self.rect.centerx)
+    dy = abs(self.player.rect.centery - self.rect.centery)
+    return dx < WINDOW_WIDTH / 2 + ENEMY_AWAKE_MARGIN and dy < WINDOW_HEIGHT / 2 + ENEMY_AWAKE_MARGIN
+
+  # Checks if any part of the enemy can be inside the window, which is centered on the player
+  def is_on_screen(self):
+    dx = abs(self.player.rect.centerx - self.rect.centerx)
+    dy = abs(self.player.rect.centery - self.rect.centery)
+    return dx < (WINDOW_WIDTH + self.rect.width) / 2 and dy < (WINDOW_HEIGHT + self.rect.height) / 2
+
   # Checks if the enemy can fire at the player
   def check_fire(self):
-    enemy_pos = pygame.math.Vector2(self.rect.center)
-    player_pos = pygame.math.Vector2(self.player.rect.center)
+    dx = self.player.rect.centerx - self.rect.centerx
+    dy = self.player.rect.centery - self.rect.centery
 
-    distance = (player_pos - enemy_pos).magnitude()  # Distance to the player
+    close = dx * dx + dy * dy < 600 * 600  # Whether the player is within 600 pixels
     # Check if the player is on the same y-axis
-    same_y = True if self.rect.top - 20 < player_pos.y < self.rect.bottom + 20 else False
+    same_y = self.rect.top - 20 < self.player.rect.centery < self.rect.bottom + 20
 
     # Fires a bullet if the conditions are met
-    if distance < 600 and same_y and self.can_shoot:
+    if close and same_y and self.can_shoot:
       bullet_direction = pygame.math.Vector2(1, 0) if self.status == 'right' else pygame.math.Vector2(-1, 0)
       y_offset = pygame.math.Vector2(0, -16)
       pos = self.rect.center + bullet_direction * 80
       self.shoot(pos + y_offset, bullet_direction, self)
 
-      self.can_shoot = False
-      self.shoot_time = pygame.time.get_ticks()
-      self.shoot_sound.play()
+      self.start_cooldown()
+      audio.play('shoot', self.rect.center, self.sound_priority)
 
-  # Updates the enemy's status, animation and checks for possible actions
+  # Updates the enemy's status, animation and checks for possible actions, only death while asleep
   def update(self, dt):
+    if not self.is_awake():
+      self.check_death()
+      return
+
     self.get_status()
-    self.animate(dt)
-    self.blink()
+    # Off screen enemies only keep their frame and mask in step while the governor saves on far animation
+    if quality.enabled('far_animation') or self.is_on_screen():
+      self.animate(dt)
+      self.blink()
+    else:
+      self.advance_frame(dt)
 
-    self.shoot_timer()
-    self.invulnerability_timer()
     self.check_fire()
 
     self.check_death()
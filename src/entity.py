@@ -1,11 +1,20 @@
 import pygame
-import os
-from math import sin
 
 from settings import *
+from clock import sim_clock
+from timers import timers
+from quality import quality
+from assets import load_animations, load_animation_masks, load_animation_silhouettes
+from audio import audio
 
 # Entity class for creating and managing an entity
 class Entity(pygame.sprite.Sprite):
+  # Settings shared by every entity of a class, stored on the class instead of each instance
+  speed = 400  # Speed of the entity
+  cooldown = 200  # Cooldown time for shooting
+  invulnerability_duration = 500  # Time duration for invulnerability after getting hit
+  sound_priority = 0  # How important the entity's sounds are when voices run out
+
   def __init__(self, pos, path, groups, shoot):
     super().__init__(groups)
 
@@ -15,93 +24,73 @@ class Entity(pygame.sprite.Sprite):
 
     self.image = self.animations[self.status][self.frame_index]
     self.rect = self.image.get_rect(topleft = pos)
-    self.old_rect = self.rect.copy()
     self.z = LAYERS['Level']  # Layer of the entity
-    self.mask = pygame.mask.from_surface(self.image)
+    self.mask = self.masks[self.status][self.frame_index]
 
     self.direction = pygame.math.Vector2()  # Direction of the entity
     self.pos = pygame.math.Vector2(self.rect.topleft)  # Position of the entity
-    self.speed = 400  # Speed of the entity
 
     self.shoot = shoot  # Shoot method for the entity
     self.can_shoot = True  # Entity's ability to shoot
     self.shoot_time = None  # Time when the entity shot
-    self.cooldown = 200  # Cooldown time for shooting
     self.duck = False  # Whether the entity is ducking or not
 
     self.health = 3  # Health of the entity
     self.is_vulnerable = True  # Entity's vulnerability to attacks
     self.hit_time = None  # Time when the entity got hit
-    self.invulnerability_duration = 500  # Time duration for invulnerability after getting hit
-
-    self.hit_sound = pygame.mixer.Sound('./resources/audio/hit.wav')  # Sound when the entity gets hit
-    self.hit_sound.set_volume(0.5)
-    self.shoot_sound = pygame.mixer.Sound('./resources/audio/bullet.wav')  # Sound when the entity shoots
-    self.hit_sound.set_volume(0.5)
 
-  # Method for importing assets for the entity
+  # Method for importing assets for the entity, shared with every entity using the same path
   def import_assets(self, path):
-    self.animations = {}
-    for index, folder in enumerate(os.walk(path)):
-      if index == 0:
-        for name in folder[1]:
-          self.animations[name] = []
-      else:
-        for file_name in sorted(folder[2], key = lambda string: int(string.split('.')[0])):
-          path = folder[0].replace(os.sep, '/') + '/' + file_name
-          surf = pygame.image.load(path).convert_alpha()
-          key = folder[0].split(os.sep)[4]
-          self.animations[key].append(surf)
-
-  # Method for making the entity blink
+    self.animations = load_animations(path)
+    self.masks = load_animation_masks(path)  # Collision mask of each animation frame
+    self.silhouettes = load_animation_silhouettes(path)  # White copy of each animation frame
+
+  # Method for making the entity blink, skipped while the quality governor has blinking turned off
   def blink(self):
-    if not self.is_vulnerable:
+    if not self.is_vulnerable and quality.enabled('blink'):
       if self.wave_value():
-        mask = pygame.mask.from_surface(self.image)
-        white_surf = mask.to_surface()
-        white_surf.set_colorkey((0, 0, 0))
-        self.image = white_surf
+        self.image = self.silhouettes[self.status][int(self.frame_index)]
 
-  # Method for getting the wave value for blinking
+  # Method for getting the wave value for blinking, the same for every entity during a step
   def wave_value(self):
-    value = sin(pygame.time.get_ticks())
-    if value >= 0:
-      return True
-    else:
-      return False
+    return sim_clock.wave
 
   # Method for causing damage to the entity
   def damage(self):
     if self.is_vulnerable:
       self.health -= 1
       self.is_vulnerable = False
-      self.hit_time = pygame.time.get_ticks()
-      self.hit_sound.play()
+      self.hit_time = sim_clock.get_ticks()
+      timers.schedule(self.hit_time + self.invulnerability_duration, self.end_invulnerability)
+      audio.play('hit', self.rect.center, self.sound_priority)
 
   # Method for checking if the entity is dead
   def check_death(self):
     if self.health <= 0:
       self.kill()
 
-  # Method for handling the entity's shooting timer
-  def shoot_timer(self):
-    if not self.can_shoot:
-      current_time = pygame.time.get_ticks()
-      if current_time - self.shoot_time > self.cooldown:
-        self.can_shoot = True
+  # Method for stopping the entity from shooting until its cooldown has passed
+  def start_cooldown(self):
+    self.can_shoot = False
+    self.shoot_time = sim_clock.get_ticks()
+    timers.schedule(self.shoot_time + self.cooldown, self.enable_shooting)
 
-  # Method for handling the entity's invulnerability timer
-  def invulnerability_timer(self):
-    if not self.is_vulnerable:
-      current_time = pygame.time.get_ticks()
-      if current_time - self.hit_time > self.invulnerability_duration:
-        self.is_vulnerable = True
+  # Method called by the entity's cooldown timer
+  def enable_shooting(self):
+    self.can_shoot = True
 
-  # Method for animating the entity
-  def animate(self, dt):
+  # Method called by the entity's invulnerability timer
+  def end_invulnerability(self):
+    self.is_vulnerable = True
+
+  # Method for advancing the animation frame, the collision mask always follows it
+  def advance_frame(self, dt):
     self.frame_index += 7 * dt
     if self.frame_index >= len(self.animations[self.status]):
       self.frame_index = 0
+    self.mask = self.masks[self.status][int(self.frame_index)]
 
+  # Method for animating the entity
+  def animate(self, dt):
+    self.advance_frame(dt)
     self.image = self.animations[self.status][int(self.frame_index)]
-    self.mask = pygame.mask.from_surface(self.image)
@@ -0,0 +1,148 @@
+import pygame
+import os, re
+from array import array
+from pytmx import TiledMap
+from pytmx.util_pygame import handle_transformation
+
+from settings import *
+from atlas import pack_atlas
+from cache import source_stamps, read_cache, write_cache
+
+CACHE_VERSION = 1  # Bump whenever the layout of the compiled cache changes
+
+# LevelObject class for holding an object placed on an object layer of the map
+class LevelObject:
+  def __init__(self, id, name, x, y, width, height, image):
+    self.id = id  # Unique id of the object in the map
+    self.name = name  # Name given to the object in the editor
+    self.x = x
+    self.y = y
+    self.width = width
+    self.height = height
+    self.image = image  # Surface of tile objects, None for plain shapes
+
+# Level class for holding the tiles and objects of a compiled TMX map
+class Level:
+  def __init__(self, data):
+    self.width = data['width']  # Width of the map in tiles
+    self.height = data['height']  # Height of the map in tiles
+    self.tile_width = data['tile_width']
+    self.tile_height = data['tile_height']
+    self.pixel_width = self.width * self.tile_width
+    self.pixel_height = self.height * self.tile_height
+
+    # Slice the tile images out of the packed atlas
+    width, height = data['atlas_size']
+    self.atlas = pygame.image.frombytes(data['atlas'], (width, height), 'RGBA').convert_alpha()
+    self.images = {gid: self.atlas.subsurface(rect) for gid, rect in data['rects'].items()}
+
+    # Tile indexes of each tile layer, stored row by row
+    self.layers = {}
+    for name, gids in data['layers'].items():
+      self.layers[name] = array('I')
+      self.layers[name].frombytes(gids)
+
+    # Objects of each object layer
+    self.object_layers = {}
+    for name, objects in data['objects'].items():
+      self.object_layers[name] = [
+        LevelObject(obj['id'], obj['name'], obj['x'], obj['y'], obj['width'], obj['height'], self.images.get(obj['gid']))
+        for obj in objects
+      ]
+
+  # Yields the position and surface of every tile in a tile layer
+  def tiles(self, name):
+    gids = self.layers[name]
+    for index, gid in enumerate(gids):
+      if gid:
+        yield index % self.width, index // self.width, self.images[gid]
+
+  # Returns the objects of an object layer
+  def objects(self, name):
+    return self.object_layers[name]
+
+# Returns the files a TMX map is built from: the map itself, its tilesets and their images
+def find_sources(path):
+  sources = [path]
+  with open(path, encoding = 'utf-8') as file:
+    text = file.read()
+  for source in re.findall(r'source="([^"]+)"', text):
+    source_path = os.path.normpath(os.path.join(os.path.dirname(path), source))
+    if source_path.endswith('.tsx'):
+      sources.extend(find_sources(source_path))
+    else:
+      sources.append(source_path)
+  return sources
+
+# Image loader for pytmx that decodes a tileset without converting its tiles for the display, so the map can be
+# parsed on a loader thread. The tiles are only packed into the atlas, which the Level converts on the main thread
+def tileset_loader(filename, colorkey, **kwargs):
+  image = pygame.image.load(filename)
+  if colorkey:
+    colorkey = pygame.Color(f'#{colorkey}')
+
+  def load_tile(rect = None, flags = None):
+    tile = image.subsurface(rect) if rect else image.copy()
+    if flags:
+      tile = handle_transformation(tile, flags)
+    if colorkey:
+      tile.set_colorkey(colorkey)
+    return tile
+
+  return load_tile
+
+# Parses the TMX map and compiles it into plain data that can be pickled, it can run on a loader thread
+def compile_level(path):
+  tmx_map = TiledMap(path, image_loader = tileset_loader)
+  used = {}
+  layers = {}
+  objects = {}
+
+  for layer in tmx_map.layers:
+    if hasattr(layer, 'data'):
+      gids = array('I', (gid for row in layer.data for gid in row))
+      for gid in gids:
+        if gid:
+          used[gid] = tmx_map.images[gid]
+      layers[layer.name] = gids.tobytes()
+    else:
+      objects[layer.name] = []
+      for obj in layer:
+        if obj.gid:
+          used[obj.gid] = tmx_map.images[obj.gid]
+        objects[layer.name].append({
+          'id': obj.id, 'name': obj.name, 'gid': obj.gid,
+          'x': obj.x, 'y': obj.y, 'width': obj.width, 'height': obj.height
+        })
+
+  atlas, rects = pack_atlas(used)
+  return {
+    'version': CACHE_VERSION,
+    'width': tmx_map.width, 'height': tmx_map.height,
+    'tile_width': tmx_map.tilewidth, 'tile_height': tmx_map.tileheight,
+    'atlas': pygame.image.tobytes(atlas, 'RGBA'), 'atlas_size': atlas.get_size(),
+    'rects': rects, 'layers': layers, 'objects': objects
+  }
+
+# Returns the path of the compiled cache of a TMX map
+def cache_path_of(path, cache_dir):
+  return os.path.join(cache_dir, os.path.basename(path) + '.cache')
+
+# Returns the compiled data of a TMX map, from the cache when its source files have not changed and compiling
+# and caching it again otherwise. Nothing is converted for the display, so it can run on a loader thread
+def read_level(path, cache_dir = LEVEL_CACHE_DIR):
+  cache_path = cache_path_of(path, cache_dir)
+  data = read_cache(cache_path, CACHE_VERSION)
+  if data is None:
+    data = compile_level(path)
+    data['sources'] = source_stamps(find_sources(path))
+    write_cache(cache_path, data)
+  return data
+
+# Builds the level from its compiled data, converting the atlas for the display, so this runs on the main thread
+def finish_level(data):
+  return Level(data)
+
+# Loads a TMX map, using the compiled cache when its source files have not changed
+def load_level(path, cache_dir = LEVEL_CACHE_DIR):
+  return finish_level(read_level(path, cache_dir))
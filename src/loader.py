@@ -0,0 +1,52 @@
+import pygame
+import sys
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from settings import *
+
+# AssetLoader class for reading and decoding assets on worker threads while the main thread draws the progress.
+# Each asset is read by a function run on a worker, and finished, for example converted for the display, on the main thread
+class AssetLoader:
+  def __init__(self, workers = LOADER_WORKERS):
+    self.workers = workers  # Number of worker threads
+    self.jobs = []  # Name, read function, its arguments and finish function of each asset
+    self.font = None  # Font of the progress text, created when the loading screen is first drawn
+
+  # Adds an asset to load: read(*args) runs on a worker thread, finish(result) then runs on the main thread
+  def add(self, name, read, *args, finish = None):
+    self.jobs.append((name, read, args, finish))
+
+  # Draws the loading screen with the share of assets that are done
+  def draw_progress(self, surface, done):
+    surface.fill((20, 20, 30))
+    text = self.font.render(f'Loading {done}/{len(self.jobs)}', True, 'white')
+    surface.blit(text, text.get_rect(midbottom = (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2 - 20)))
+
+    bar = pygame.Rect(0, 0, WINDOW_WIDTH / 2, 16)
+    bar.center = (WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2)
+    pygame.draw.rect(surface, 'white', bar, 1)
+    pygame.draw.rect(surface, 'white', (bar.x, bar.y, bar.width * done / max(len(self.jobs), 1), bar.height))
+    pygame.display.update()
+
+  # Loads every asset, drawing the loading screen on the surface when one is given, and returns the finished assets by name
+  def run(self, surface = None):
+    results = {}
+    if surface and self.font is None:
+      self.font = pygame.font.Font(None, 36)
+    with ThreadPoolExecutor(self.workers) as executor:
+      pending = {executor.submit(read, *args): (name, finish) for name, read, args, finish in self.jobs}
+      while pending:
+        if surface:
+          for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+              executor.shutdown(cancel_futures = True)
+              pygame.quit()
+              sys.exit()
+          self.draw_progress(surface, len(results))
+
+        done, _ = wait(pending, timeout = 1 / 30, return_when = FIRST_COMPLETED)
+        for future in done:
+          name, finish = pending.pop(future)
+          result = future.result()
+          results[name] = finish(result) if finish else result
+    return results
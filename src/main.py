@@ -1,175 +1,483 @@
 # Import necessary modules
-import pygame, sys
-from pytmx.util_pygame import load_pygame
+import pygame, sys, os, time, argparse
 
 from settings import *
-from tile import Tile, CollisionTile, MovingPlatform
+from tile import CollisionTile, MovingPlatform
 from player import Player
-from bullet import Bullet, FireAnimation
+from bullet import BulletSystem, FireAnimation
 from enemy import Enemy
-from overlay import Overlay
+from overlay import Overlay, ProfilerOverlay
+from spatial import SpatialGrid, CollisionSprites, merge_rects
+from sky import ParallaxSky
+from streaming import LevelStreamer
+from static_layer import StaticLayer
+from functools import partial
+from level import read_level, finish_level
+from atlas import read_atlas
+from loader import AssetLoader
+from assets import load_image, load_mask, preload_atlas, preload_image, preload_sound
+from pool import Pool
+from clock import sim_clock
+from timers import timers
+from snapshot import capture_snapshot, restore_snapshot
+from profiler import profiler
+from quality import quality
+from audio import audio
+from controls import KeyboardInput, RecordingInput, ReplayInput
 
 # Define the AllSprites group, where all the sprites in the game will be stored
 class AllSprites(pygame.sprite.Group):
-  def __init__(self):
+  def __init__(self, level):
     super().__init__()
     # Get the display surface where the sprites will be drawn
     self.display_surface = pygame.display.get_surface()
     # Initialize an offset vector to adjust the drawing of the sprites based on the player's position
     self.offset = pygame.math.Vector2()
 
-    # Load images for the sky and the TMX map
-    self.fg_sky = pygame.image.load('./resources/graphics/sky/fg_sky.png').convert_alpha()
-    self.bg_sky = pygame.image.load('./resources/graphics/sky/bg_sky.png').convert_alpha()
-    tmx_map = load_pygame('./resources/data/map.tmx')
+    # Sprites kept per z layer: static tiles in a spatial grid, sprites in insertion order
+    self.static_layers = {}
+    self.dynamic_layers = {}
+    self.baked_layers = {}
+    self.systems = {}
+    self.z_order = []
+    self.pending = {}  # Sprites added since the last draw
 
-    # Calculate the number of times the sky image should be drawn to cover the whole map
-    self.padding = WINDOW_WIDTH / 2
-    self.sky_width = self.bg_sky.get_width()
-    map_width = tmx_map.tilewidth * tmx_map.width + (2 * self.padding)
-    self.sky_num = int(map_width // self.sky_width)
+    # Sky drawn behind the level, and the camera position of the last draw
+    self.sky = ParallaxSky(level.pixel_width)
+    self.camera_rect = pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
+    self.last_offset = None
 
-  # Method to draw the sprites on the screen, sorted by their z attribute
-  def customize_draw(self, player):
-    # Update the offset according to the player's position
+  # Registers a new z layer and keeps the drawing order sorted
+  def add_layer(self, z):
+    self.static_layers[z] = SpatialGrid(DRAW_CELL_SIZE)
+    self.dynamic_layers[z] = {}
+    self.z_order = sorted(self.static_layers)
+
+  # Adds a tile layer that is drawn from pre-rendered chunks instead of sprites
+  def add_static_layer(self, static_layer):
+    if static_layer.z not in self.static_layers:
+      self.add_layer(static_layer.z)
+    self.baked_layers[static_layer.z] = static_layer
+
+  # Adds an object that draws many things at once, such as the bullets, on top of its layer's sprites
+  def add_system(self, system):
+    if system.z not in self.static_layers:
+      self.add_layer(system.z)
+    self.systems.setdefault(system.z, []).append(system)
+
+  # Indexes a tile that never moves by position, the tile does not join the group
+  def add_static(self, tile):
+    if tile.z not in self.static_layers:
+      self.add_layer(tile.z)
+    self.static_layers[tile.z].add(tile, tile.image.get_rect(center = tile.rect.center))
+
+  # Removes a tile added with add_static
+  def remove_static(self, tile):
+    self.static_layers[tile.z].remove(tile)
+
+  # Queues the sprite as it joins the group, it is sorted into its layer before the next draw
+  def add_internal(self, sprite, layer = None):
+    super().add_internal(sprite, layer)
+    self.pending[sprite] = None
+
+  # Takes the sprite out of its layer bucket as it leaves the group
+  def remove_internal(self, sprite):
+    super().remove_internal(sprite)
+    if sprite in self.pending:
+      del self.pending[sprite]
+    else:
+      del self.dynamic_layers[sprite.z][sprite]
+
+  # Sorts the queued sprites into their layers
+  def sort_pending(self):
+    for sprite in self.pending:
+      if sprite.z not in self.static_layers:
+        self.add_layer(sprite.z)
+      self.dynamic_layers[sprite.z][sprite] = None
+    self.pending.clear()
+
+  # Moves the camera to the player, returns whether it moved since the last call
+  def update_camera(self, player):
     self.offset.x = player.rect.centerx - WINDOW_WIDTH / 2
     self.offset.y = player.rect.centery - WINDOW_HEIGHT / 2
+    self.camera_rect = pygame.Rect(int(self.offset.x) - 1, int(self.offset.y) - 1, WINDOW_WIDTH + 2, WINDOW_HEIGHT + 2)
+
+    moved = self.offset != self.last_offset
+    self.last_offset = self.offset.copy()
+    return moved
+
+  # Returns the screen rects of everything that can change without the camera moving
+  def dirty_rects(self):
+    self.sort_pending()
+    rects = []
+    for z in self.z_order:
+      for sprite in self.dynamic_layers[z]:
+        rect = sprite.image.get_rect(center = sprite.rect.center)
+        if rect.colliderect(self.camera_rect):
+          rects.append(rect.move(-self.offset.x, -self.offset.y))
+      for system in self.systems.get(z, ()):
+        rects.extend(system.dirty_rects(self.offset, self.camera_rect))
+    return rects
+
+  # Method to draw the sprites on the screen, layer by layer, skipping anything outside the camera or the area
+  def customize_draw(self, player, area = None):
+    # Update the offset according to the player's position
+    self.update_camera(player)
+    camera_rect = self.camera_rect
+    if area:
+      camera_rect = area.move(self.offset.x, self.offset.y).inflate(2, 2)
+
+    # Draw the sky images, unless the quality governor turned the parallax off
+    if quality.enabled('parallax'):
+      self.sky.draw(self.offset)
+
+    # Draw the layers, baked chunks first, then static and moving sprites, then systems
+    self.sort_pending()
+    for z in self.z_order:
+      if z in self.baked_layers:
+        self.baked_layers[z].draw(self.display_surface, self.offset, camera_rect)
 
-    # Draw the sky images
-    for x in range(self.sky_num):
-      x_pos = -self.padding + (x * self.sky_width)
-      self.display_surface.blit(self.bg_sky, (x_pos - self.offset.x / 2.5, 900 - self.offset.y / 2.5))
-      self.display_surface.blit(self.fg_sky, (x_pos - self.offset.x / 2, 900 - self.offset.y / 2))
+      visible = self.static_layers[z].query(camera_rect)
+      visible.extend(self.dynamic_layers[z])
 
-    # Draw the sprites
-    for sprite in sorted(self.sprites(), key = lambda sprite: sprite.z):
-      offset_rect = sprite.image.get_rect(center = sprite.rect.center)
-      offset_rect.center -= self.offset
-      self.display_surface.blit(sprite.image, offset_rect)
+      blits = 0
+      for sprite in visible:
+        offset_rect = sprite.image.get_rect(center = sprite.rect.center)
+        if offset_rect.colliderect(camera_rect):
+          offset_rect.center -= self.offset
+          self.display_surface.blit(sprite.image, offset_rect)
+          blits += 1
+      profiler.count('blits', blits)
+
+      for system in self.systems.get(z, ()):
+        system.draw(self.display_surface, self.offset, camera_rect)
 
 # Define the Game class, which manages the game loop and the game state
 class Game:
-  def __init__(self):
+  def __init__(self, headless = False, input_source = None, dirty_rects = DIRTY_RECTS, config = None, fps = TARGET_FPS, vsync = VSYNC, checkpoints = True):
+    # Without a window the game runs on the dummy drivers and draws nothing
+    self.headless = headless
+    self.config = config or {}  # Attribute overrides for the player and enemies, by kind
+    self.over = False  # Whether the player has died
+    # Whether the player respawns at the last checkpoint instead of the game ending, a rule of the game
+    # that never depends on the window, so a session plays back the same with or without one
+    self.checkpoints = checkpoints
+    self.checkpoint = None  # Snapshot of the world the player respawns in
+    self.checkpoint_time = 0  # Simulation time the checkpoint was taken at
+    self.respawning = False  # Whether the player died during this step
+    self.dirty_rects = dirty_rects  # Whether only the changed parts of the screen are redrawn
+    self.previous_rects = []  # Areas that changed on the last frame drawn with dirty rects
+    self.input_source = input_source or KeyboardInput()  # Source of the player's keys
+    self.fps = fps  # Frame rate the game loop is capped to, 0 for no cap
+    if headless:
+      os.environ['SDL_VIDEODRIVER'] = 'dummy'
+      os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
     # Initialize Pygame, create the game window and set the window title
     pygame.init()
-    self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    # Vsync needs a renderer, which pygame only creates for scaled or OpenGL windows
+    if vsync and not headless:
+      self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SCALED, vsync = 1)
+    else:
+      self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     pygame.display.set_caption('Contra Clone')
     self.clock = pygame.time.Clock()
+    sim_clock.reset()
+    timers.clear()
 
-    # Create the groups of sprites
-    self.all_sprites = AllSprites()
-    self.collision_sprites = pygame.sprite.Group()
-    self.platform_sprites = pygame.sprite.Group()
-    self.bullet_sprites = pygame.sprite.Group()
+    # Read and decode the level, sprites, sky and sounds on worker threads while the loading screen shows the progress,
+    # the level comes from the compiled cache when the map has not changed
+    loader = AssetLoader()
+    loader.add('level', read_level, LEVEL_PATH, finish = finish_level)
+    loader.add('atlas', read_atlas, finish = preload_atlas)
+    for path, _ in SKY_LAYERS:
+      loader.add(path, pygame.image.load, path, finish = partial(preload_image, path))
+    if not headless:
+      for path, volume, _ in AUDIO_SOUNDS.values():
+        loader.add(path, pygame.mixer.Sound, path, finish = partial(preload_sound, path, volume))
+    self.level = loader.run(None if headless else self.display_surface)['level']
+
+    # Create the groups of sprites, all_sprites only draws them and the groups below update them
+    self.all_sprites = AllSprites(self.level)
+    self.collision_sprites = CollisionSprites()
     self.vulnerable_sprites = pygame.sprite.Group()
+    self.player_sprites = pygame.sprite.GroupSingle()
+    self.enemy_sprites = pygame.sprite.Group()
+    self.platform_sprites = pygame.sprite.Group()
+    self.effect_sprites = pygame.sprite.Group()  # Fire animations
+    self.enemy_groups = [self.all_sprites, self.vulnerable_sprites, self.enemy_sprites]  # Groups every enemy joins
+
+    # Groups updated on every step after the bullets, in this order, so fire follows where its shooter ended up
+    self.update_order = (self.player_sprites, self.enemy_sprites, self.platform_sprites, self.effect_sprites)
 
-    # Set up the game, create the overlay and load the bullet and fire images
+    # Set up the game, create the overlay and load the bullet and fire images for both directions
     self.setup()
     self.overlay = Overlay(self.player)
+    self.profiler_overlay = ProfilerOverlay(profiler)
 
-    self.bullet_surf = pygame.image.load('./resources/graphics/bullet.png').convert_alpha()
-    self.fire_surfs = [
-      pygame.image.load('./resources/graphics/fire/0.png').convert_alpha(),
-      pygame.image.load('./resources/graphics/fire/1.png').convert_alpha()
-    ]
+    self.bullet_surfs = {flip: load_image('./resources/graphics/bullet.png', flip) for flip in (False, True)}
+    self.bullet_masks = {flip: load_mask('./resources/graphics/bullet.png', flip) for flip in (False, True)}
+    self.fire_surfs = {
+      flip: [
+        load_image('./resources/graphics/fire/0.png', flip),
+        load_image('./resources/graphics/fire/1.png', flip)
+      ] for flip in (False, True)
+    }
 
-    # Load and play the game music
-    self.music = pygame.mixer.Sound('./resources/audio/music.wav')
-    self.music.play(loops = -1)
+    # Every bullet lives in one system, fire animations are preallocated and recycled on every shot
+    self.bullets = BulletSystem(self.level, self.bullet_surfs, self.bullet_masks)
+    self.all_sprites.add_system(self.bullets)
+    self.fire_pool = Pool(FireAnimation, FIRE_POOL_SIZE, [self.all_sprites, self.effect_sprites])
 
-  # Set up the game level, and create the player and enemy entities
-  def setup(self):
-    tmx_map = load_pygame('./resources/data/map.tmx')
+    # Without a window the game is muted, otherwise start the sounds and stream the game music from disk
+    audio.start(enabled = not headless)
+    if not headless and pygame.mixer.get_init():
+      pygame.mixer.music.load(MUSIC_PATH)
+      pygame.mixer.music.play(loops = -1)
 
-    for x, y, surf in tmx_map.get_layer_by_name('Level').tiles():
-      CollisionTile((x * 64, y * 64), surf, [self.all_sprites, self.collision_sprites])
+    if self.checkpoints:
+      self.save_checkpoint()
 
+  # Set up the game level, and create the player and enemy entities
+  def setup(self):
     for layer in ['BG', 'BG Detail', 'FG Detail Bottom', 'FG Detail Top']:
-      for x, y, surf in tmx_map.get_layer_by_name(layer).tiles():
-        Tile((x * 64, y * 64), surf, self.all_sprites, LAYERS[layer])
+      tiles = [((x * 64, y * 64), surf) for x, y, surf in self.level.tiles(layer)]
+      self.all_sprites.add_static_layer(StaticLayer(tiles, LAYERS[layer]))
 
-    for obj in tmx_map.get_layer_by_name('Entities'):
+    for obj in self.level.objects('Entities'):
       if obj.name == 'Player':
         self.player = Player(
             pos = (obj.x, obj.y),
-            groups = [self.all_sprites, self.vulnerable_sprites],
+            groups = [self.all_sprites, self.vulnerable_sprites, self.player_sprites],
             path = './resources/graphics/player',
             collision_sprites = self.collision_sprites,
-            shoot = self.shoot
+            shoot = self.shoot,
+            input_source = self.input_source,
+            on_death = self.player_died
           )
+        self.apply_config(self.player, 'player')
+        self.respawn_health = self.player.health  # Health the player respawns with
 
-      if obj.name == 'Enemy':
-        Enemy(
-          pos = (obj.x, obj.y),
-          path = './resources/graphics/enemy',
-          groups = [self.all_sprites, self.vulnerable_sprites],
-          shoot = self.shoot,
-          player = self.player,
-          collision_sprites = self.collision_sprites
+    # Collision tiles and enemies are only created for the regions around the player
+    self.streamer = LevelStreamer(self.level, self.create_tile, self.remove_tile, self.create_enemy)
+    self.streamer.update(self.player.rect.center)
+
+    # Each platform moves between the closest borders above and below it, paired up once here
+    objects = self.level.objects('Platforms')
+    borders = [pygame.Rect(obj.x, obj.y, obj.width, obj.height) for obj in objects if obj.name != 'Platform']
+    for obj in objects:
+      if obj.name == 'Platform':
+        MovingPlatform(
+          (obj.x, obj.y), obj.image, [self.all_sprites, self.collision_sprites, self.platform_sprites],
+          borders, self.level.pixel_height
         )
 
-    self.platform_border_rects = []
+  # Create a collision tile for the level streamer
+  def create_tile(self, pos, surf):
+    tile = CollisionTile(pos, surf)
+    self.all_sprites.add_static(tile)
+    self.collision_sprites.add_static(tile)
+    return tile
 
-    for obj in tmx_map.get_layer_by_name('Platforms'):
-      if obj.name == 'Platform':
-        MovingPlatform((obj.x, obj.y), obj.image, [self.all_sprites, self.collision_sprites, self.platform_sprites])
-      else:
-        border_rect = pygame.Rect(obj.x, obj.y, obj.width, obj.height)
-        self.platform_border_rects.append(border_rect)
+  # Remove a collision tile evicted by the level streamer
+  def remove_tile(self, tile):
+    self.all_sprites.remove_static(tile)
+    self.collision_sprites.remove_static(tile)
+
+  # Create an enemy for the level streamer
+  def create_enemy(self, pos):
+    enemy = Enemy(
+      pos = pos,
+      path = './resources/graphics/enemy',
+      groups = self.enemy_groups,
+      shoot = self.shoot,
+      player = self.player,
+      collision_sprites = self.collision_sprites
+    )
+    self.apply_config(enemy, 'enemy')
+    return enemy
 
-  # Check for collisions between platforms and borders, and the player and the platforms
+  # Override the attributes of a new player or enemy with the values given for its kind in the config
+  def apply_config(self, entity, kind):
+    for name, value in self.config.get(kind, {}).items():
+      if not hasattr(entity, name):
+        raise ValueError(f'{kind} has no attribute {name!r} to override')
+      setattr(entity, name, value)
+
+  # Take a snapshot of the world for the player to respawn in
+  def save_checkpoint(self):
+    self.checkpoint = capture_snapshot(self)
+    self.checkpoint_time = sim_clock.get_ticks()
+
+  # Put the world back the way it was at the last checkpoint, with the player at full health
+  def respawn(self):
+    restore_snapshot(self, self.checkpoint)
+    self.player.health = self.respawn_health
+
+  # Respawn the player at the last checkpoint once the step is over, or end the game when there are no checkpoints,
+  # without a window the game then just stops stepping
+  def player_died(self):
+    if self.checkpoints:
+      self.respawning = True
+      return
+
+    self.over = True
+    if not self.headless:
+      pygame.quit()
+      sys.exit()
+
+  # Turn back the platforms moving down into the player, the borders are already part of their tracks
   def platform_collisions(self):
-    for platform in self.platform_sprites.sprites():
-      for border in self.platform_border_rects:
-        if platform.rect.colliderect(border):
-          if platform.direction.y < 0:
-            platform.rect.top = border.bottom
-            platform.pos.y = platform.rect.y
-            platform.direction.y = 1
-          else:
-            platform.rect.bottom = border.top
-            platform.pos.y = platform.rect.y
-            platform.direction.y = -1
-
-      if platform.rect.colliderect(self.player.rect) and self.player.rect.centery > platform.rect.centery:
+    for platform in self.collision_sprites.query(self.player.rect):
+      if isinstance(platform, MovingPlatform) and self.player.rect.centery > platform.rect.centery:
         platform.rect.bottom = self.player.rect.top
-        platform.pos.y = platform.rect.y
-        platform.direction.y = -1
+        platform.turn_up()
 
   # Check for collisions between bullets and other entities, and deal damage accordingly
   def bullet_collisions(self):
-    for obstacle in self.collision_sprites.sprites():
-      pygame.sprite.spritecollide(obstacle, self.bullet_sprites, True)
-
-    for sprite in self.vulnerable_sprites.sprites():
-      if pygame.sprite.spritecollide(sprite, self.bullet_sprites, True, pygame.sprite.collide_mask):
-        sprite.damage()
+    self.bullets.collide(self.platform_sprites, self.vulnerable_sprites)
 
   # Shoot a bullet
   def shoot(self, pos, direction, entity):
-    Bullet(pos, self.bullet_surf, direction, [self.all_sprites, self.bullet_sprites])
-    FireAnimation(entity, self.fire_surfs, direction, self.all_sprites)
+    flip = direction.x < 0
+    self.bullets.spawn(pos, direction)
+    self.fire_pool.acquire(entity, self.fire_surfs[flip], direction)
+
+  # Advance the game state by dt seconds
+  def step(self, dt):
+    dt = self.input_source.read(dt)  # A replay decides the dt of each frame
+    dt = min(dt, MAX_FRAME_DT)  # A hitch slows the game down instead of letting movers skip through tiles
+    sim_clock.advance(dt)
+    profiler.count('timers fired', timers.update(sim_clock.get_ticks()))
+    audio.listen(self.player.rect.center)
+    self.streamer.update(self.player.rect.center)
+
+    with profiler.scope('platform_collisions'):
+      self.platform_collisions()
+    with profiler.scope('update'):
+      with profiler.scope('update.BulletSystem'):
+        self.bullets.update(dt, self.platform_sprites.sprites(), self.vulnerable_sprites.sprites())
+      for group in self.update_order:
+        profiler.update_group(group, dt)
+    with profiler.scope('bullet_collisions'):
+      self.bullet_collisions()
+
+    if self.respawning:
+      self.respawning = False
+      self.respawn()
+    elif self.checkpoints and sim_clock.get_ticks() - self.checkpoint_time >= CHECKPOINT_INTERVAL and self.player.on_floor and self.player.is_vulnerable:
+      self.save_checkpoint()
+
+  # Render the game objects and the overlays
+  def draw(self):
+    with profiler.scope('draw'):
+      self.display_surface.fill((249, 131, 103))
+      self.all_sprites.customize_draw(self.player)
+    with profiler.scope('overlay'):
+      self.overlay.display()
+      self.profiler_overlay.display()
 
-  # The game loop, which handles events, updates the game state and renders the game objects
+  # Redraw only the areas that changed while the camera stands still, returns None after a full redraw.
+  # The profiler overlay covers too much to track, so everything is redrawn while it is shown and once after it is hidden
+  def draw_dirty(self):
+    moved = self.all_sprites.update_camera(self.player)
+    rects = self.all_sprites.dirty_rects()
+    areas = self.previous_rects + rects + [self.overlay.rect]
+    self.previous_rects = rects
+
+    if moved or quality.changed or self.profiler_overlay.visible or self.profiler_overlay.changed or len(areas) > DIRTY_RECT_LIMIT:
+      self.draw()
+      return None
+
+    areas = merge_rects(areas)
+    with profiler.scope('draw'):
+      for area in areas:
+        self.display_surface.set_clip(area)
+        self.display_surface.fill((249, 131, 103))
+        self.all_sprites.customize_draw(self.player, area)
+    with profiler.scope('overlay'):
+      self.display_surface.set_clip(self.overlay.rect)
+      self.overlay.display()
+    self.display_surface.set_clip(None)
+    return areas
+
+  # The game loop, which handles events, updates the game state and renders the game objects,
+  # sleeping to hold the frame rate and letting the quality governor react to slow frames
   def run(self):
+    quality.start(self.fps)
     while True:
       for event in pygame.event.get():
         if event.type == pygame.QUIT:
           pygame.quit()
           sys.exit()
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+          self.profiler_overlay.toggle()
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+          if profiler.history:
+            profiler.dump(PROFILER_DUMP_PATH)
+          profiler.force()
 
-      dt = self.clock.tick() / 1000
-      self.display_surface.fill((249, 131, 103))
+      dt = self.clock.tick(self.fps) / 1000
 
-      self.platform_collisions()
-      self.all_sprites.update(dt)
-      self.bullet_collisions()
-      self.all_sprites.customize_draw(self.player)
-      self.overlay.display()
+      # Only the work is timed for the governor, not the wait for the display
+      start = time.perf_counter()
+      self.step(dt)
+      if self.dirty_rects:
+        areas = self.draw_dirty()
+      else:
+        self.draw()
+        areas = None
+      quality.update(time.perf_counter() - start)
+      profiler.count('quality level', quality.level)
+
+      pygame.display.update(areas)
+      profiler.end_frame()
 
-      pygame.display.update()
+  # Run the game logic for a number of fixed steps as fast as possible, without drawing,
+  # returns the number of steps run before the player died or the steps ran out
+  def run_headless(self, frames, dt = FIXED_DT):
+    for frame in range(frames):
+      if self.over:
+        return frame
+      self.step(dt)
+      profiler.end_frame()
+    return frames
 
 # The entry point of the script, which creates a Game instance and starts the game loop
 if __name__ == '__main__':
-  game = Game()
-  game.run()
+  parser = argparse.ArgumentParser(description = 'Contra Clone')
+  parser.add_argument('--headless', action = 'store_true', help = 'run the game logic without a window or sound')
+  parser.add_argument('--frames', type = int, default = 3600, help = 'number of fixed steps to simulate when headless')
+  parser.add_argument('--no-checkpoints', dest = 'checkpoints', action = 'store_false', help = 'end the game when the player dies instead of respawning at the last checkpoint')
+  parser.add_argument('--record', metavar = 'FILE', help = 'record the keys of this session to a file')
+  parser.add_argument('--replay', metavar = 'FILE', help = 'play back the keys recorded in a file')
+  parser.add_argument('--dirty-rects', action = 'store_true', default = DIRTY_RECTS, help = 'redraw only the parts of the screen that changed while the camera stands still')
+  parser.add_argument('--fps', type = int, default = TARGET_FPS, help = 'frame rate to cap the game to, 0 for no cap')
+  parser.add_argument('--vsync', action = 'store_true', default = VSYNC, help = 'wait for the display refresh when presenting a frame')
+  parser.add_argument('--profile', metavar = 'FILE', help = 'profile every frame and write the timings to a .json or .csv file')
+  args = parser.parse_args()
+
+  replay = ReplayInput(args.replay) if args.replay else None
+  input_source = replay or KeyboardInput()
+  if args.record:
+    input_source = RecordingInput(input_source, args.record)
+
+  game = Game(headless = args.headless, input_source = input_source, dirty_rects = args.dirty_rects, fps = args.fps, vsync = args.vsync, checkpoints = args.checkpoints)
+  if args.profile:
+    profiler.force()
+
+  try:
+    if args.headless:
+      frames = len(replay.frames) if replay else args.frames
+      start = time.perf_counter()
+      frames = game.run_headless(frames)
+      elapsed = time.perf_counter() - start
+      print(f'{frames} frames in {elapsed:.2f}s ({frames / elapsed:.0f} frames per second)')
+      if game.over:
+        print('The player died')
+    else:
+      game.run()
+  finally:
+    input_source.close()
+    if args.profile:
+      profiler.dump(args.profile)
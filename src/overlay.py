@@ -1,11 +1,18 @@
 import pygame
+from itertools import islice
+from settings import *
+from assets import load_image
 
 # Overlay class for creating and displaying an overlay
 class Overlay:
   def __init__(self, player):
     self.player = player  # Player for which the overlay is displayed
     self.display_surface = pygame.display.get_surface()  # Surface on which the overlay is displayed
-    self.health_surf = pygame.image.load('./resources/graphics/health.png').convert_alpha()  # Image of the health icon
+    self.health_surf = load_image('./resources/graphics/health.png')  # Image of the health icon
+
+    # Area covered by the icons at full health
+    width = self.player.health * (self.health_surf.get_width() + 4)
+    self.rect = pygame.Rect(10, 10, width, self.health_surf.get_height())
 
   # Displays the health of the player
   def display(self):
@@ -14,3 +21,59 @@ class Overlay:
       x = 10 + h * (self.health_surf.get_width() + 4)
       y = 10
       self.display_surface.blit(self.health_surf, (x, y))  # Blits the health icon on the surface
+
+# ProfilerOverlay class for drawing the profiler's rolling frame graph and counters
+class ProfilerOverlay:
+  def __init__(self, profiler):
+    self.profiler = profiler  # Profiler whose history is drawn
+    self.display_surface = pygame.display.get_surface()
+    self.font = pygame.font.Font(None, 20)
+    self.visible = False
+    self.changed = False  # Whether the overlay was shown or hidden since it was last drawn
+
+    # Size and position of the graph, one pixel column per frame
+    self.width, self.height = PROFILER_GRAPH_FRAMES, 120
+    self.panel = pygame.Surface((self.width, self.height + 140), pygame.SRCALPHA)
+    self.rect = self.panel.get_rect(topright = (WINDOW_WIDTH - 10, 10))
+
+  # Shows or hides the overlay, profiling runs while it is shown unless it was forced on
+  def toggle(self):
+    self.visible = not self.visible
+    self.changed = True
+    self.profiler.enabled = self.visible or self.profiler.forced
+
+  # Draws stacked bars of the phase times of the last frames, with a line at the 60 FPS budget
+  def draw_graph(self, frames):
+    scale = self.height / (2 * 1000 / 60)  # Pixels per millisecond, the budget sits halfway up
+    for x, frame in enumerate(frames):
+      y = self.height
+      for phase, color in PROFILER_PHASES.items():
+        bar = frame['timings'].get(phase, 0.0) * scale
+        pygame.draw.line(self.panel, color, (x, y), (x, max(y - bar, 0)))
+        y -= bar
+    pygame.draw.line(self.panel, 'white', (0, self.height // 2), (self.width, self.height // 2))
+
+  # Draws the average time of each phase and the counters of the last frame
+  def draw_text(self, frames):
+    lines = []
+    for phase, color in PROFILER_PHASES.items():
+      average = sum(frame['timings'].get(phase, 0.0) for frame in frames) / len(frames)
+      lines.append((f'{phase}: {average:.2f} ms', color))
+    for name, value in sorted(frames[-1]['counters'].items()):
+      lines.append((f'{name}: {value}', 'white'))
+
+    for index, (text, color) in enumerate(lines):
+      self.panel.blit(self.font.render(text, True, color), (0, self.height + 6 + index * 14))
+
+  # Draws the overlay when it is shown and there is something to draw
+  def display(self):
+    self.changed = False
+    if not self.visible or not self.profiler.history:
+      return
+
+    # Only the frames the graph has room for are taken, the history can grow without bound while profiling a whole run
+    frames = list(islice(reversed(self.profiler.history), self.width))[::-1]
+    self.panel.fill((0, 0, 0, 160))
+    self.draw_graph(frames)
+    self.draw_text(frames)
+    self.display_surface.blit(self.panel, self.rect.topleft)
@@ -1,17 +1,24 @@
-import pygame, sys
+import pygame
+from math import ceil
 
 from settings import *
 from entity import Entity
+from audio import audio
 
 # Player class for creating and managing a player
 class Player(Entity):
-  def __init__(self, pos, groups, path, collision_sprites, shoot):
+  gravity = 15  # Gravity affecting the player
+  jump_speed = 1400  # Jump speed of the player
+  sound_priority = 1  # The player's own sounds are never stolen by the enemies'
+
+  def __init__(self, pos, groups, path, collision_sprites, shoot, input_source, on_death):
     super().__init__(pos, path, groups, shoot)
+    self.old_rect = self.rect.copy()  # Position of the player before its last move
 
     self.collision_sprites = collision_sprites
+    self.input_source = input_source  # Where the held keys are read from, live or replayed
+    self.on_death = on_death  # Called when the player runs out of health
 
-    self.gravity = 15  # Gravity affecting the player
-    self.jump_speed = 1400  # Jump speed of the player
     self.on_floor = False  # Whether the player is on the floor or not
     self.moving_floor = None  # The floor the player is currently on
 
@@ -32,7 +39,7 @@ class Player(Entity):
   def check_contact(self):
     bottom_rect = pygame.Rect(0, 0, self.rect.width, 5)
     bottom_rect.midtop = self.rect.midbottom
-    for sprite in self.collision_sprites.sprites():
+    for sprite in self.collision_sprites.query(bottom_rect):
       if sprite.rect.colliderect(bottom_rect):
         if self.direction.y > 0:
           self.on_floor = True
@@ -41,7 +48,7 @@ class Player(Entity):
 
   # Method for handling player input
   def input(self):
-    keys = pygame.key.get_pressed()
+    keys = self.input_source.get_pressed()
 
     if keys[pygame.K_RIGHT]:
       self.direction.x = 1
@@ -67,9 +74,8 @@ class Player(Entity):
 
       self.shoot(pos + y_offset, direction, self)
 
-      self.can_shoot = False
-      self.shoot_time = pygame.time.get_ticks()
-      self.shoot_sound.play()
+      self.start_cooldown()
+      audio.play('shoot', self.rect.center, self.sound_priority)
 
     # DEBUG: Fly Mode
     # if keys[pygame.K_DOWN]:
@@ -81,7 +87,7 @@ class Player(Entity):
 
   # Method for handling player collision with other objects
   def collision(self, direction):
-    for sprite in self.collision_sprites.sprites():
+    for sprite in self.collision_sprites.query(self.rect):
       if sprite.rect.colliderect(self.rect):
 
         if direction == 'horizontal':
@@ -106,26 +112,39 @@ class Player(Entity):
     if self.on_floor and self.direction.y != 0:
       self.on_floor = False
 
-  # Method for moving the player
+  # Method for getting how many substeps the move is split into, so no step is longer than MAX_STEP_DISTANCE
+  def substeps(self, dt):
+    distance = max(abs(self.direction.x * self.speed), abs(self.direction.y + self.gravity)) * dt
+    return min(MAX_SUBSTEPS, max(1, ceil(distance / MAX_STEP_DISTANCE)))
+
+  # Method for moving the player, in substeps on long frames so it cannot pass through tiles or platforms
   def move(self, dt):
     if self.duck and self.on_floor:
       self.direction.x = 0
 
-    self.pos.x += self.direction.x * self.speed * dt
-    self.rect.x = round(self.pos.x)
-    self.collision('horizontal')
-
-    self.direction.y += self.gravity
-    self.pos.y += self.direction.y * dt
-
-    if self.moving_floor and self.moving_floor.direction.y > 0 and self.direction.y > 0:
-      self.direction.y = 0
-      self.rect.bottom = self.moving_floor.rect.top
-      self.pos.y = self.rect.y
-      self.on_floor = True
-
-    self.rect.y = round(self.pos.y)
-    self.collision('vertical')
+    steps = self.substeps(dt)
+    dt /= steps
+    for step in range(steps):
+      if step:
+        self.old_rect = self.rect.copy()
+
+      self.pos.x += self.direction.x * self.speed * dt
+      self.rect.x = round(self.pos.x)
+      self.collision('horizontal')
+
+      # Gravity is added once per frame, whatever the number of substeps
+      if not step:
+        self.direction.y += self.gravity
+      self.pos.y += self.direction.y * dt
+
+      if self.moving_floor and self.moving_floor.direction.y > 0 and self.direction.y > 0:
+        self.direction.y = 0
+        self.rect.bottom = self.moving_floor.rect.top
+        self.pos.y = self.rect.y
+        self.on_floor = True
+
+      self.rect.y = round(self.pos.y)
+      self.collision('vertical')
     self.moving_floor = None
 
     # DEBUG: Fly Mode
@@ -136,8 +155,7 @@ class Player(Entity):
   # Method for checking if the player is dead
   def check_death(self):
     if self.health <= 0:
-      pygame.quit()
-      sys.exit()
+      self.on_death()
 
   # Method for updating the player's status
   def update(self, dt):
@@ -150,7 +168,4 @@ class Player(Entity):
     self.animate(dt)
     self.blink()
 
-    self.shoot_timer()
-    self.invulnerability_timer()
-
     self.check_death()
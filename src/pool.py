@@ -0,0 +1,23 @@
+# Pool class for recycling a fixed number of sprites instead of creating and killing new ones
+class Pool:
+  def __init__(self, sprite_class, size, groups):
+    self.groups = groups  # Groups an acquired sprite joins
+    self.free = [sprite_class(self) for _ in range(size)]  # Sprites ready to be used
+    self.active = {}  # Sprites in use, oldest first
+
+  # Takes a free sprite, or the oldest active one when none are free, and resets it
+  def acquire(self, *args):
+    if not self.free:
+      next(iter(self.active)).kill()
+
+    sprite = self.free.pop()
+    sprite.reset(*args)
+    sprite.add(self.groups)
+    self.active[sprite] = None
+    return sprite
+
+  # Gives a sprite back to the pool once it has left its groups
+  def release(self, sprite):
+    if sprite in self.active:
+      del self.active[sprite]
+      self.free.append(sprite)
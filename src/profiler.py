@@ -0,0 +1,110 @@
+import csv, json, time
+from collections import deque
+
+from settings import *
+
+# NullScope class returned while profiling is off, entering and leaving it does nothing
+class NullScope:
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc_info):
+    return False
+
+NULL_SCOPE = NullScope()
+
+# Scope class for timing a named block of code
+class Scope:
+  def __init__(self, profiler, name):
+    self.profiler = profiler
+    self.name = name
+
+  def __enter__(self):
+    self.start = time.perf_counter()
+    return self
+
+  def __exit__(self, *exc_info):
+    self.profiler.add_time(self.name, time.perf_counter() - self.start)
+    return False
+
+# Profiler class for collecting named timings and counters per frame
+class Profiler:
+  def __init__(self, history = PROFILER_HISTORY):
+    self.enabled = False  # Nothing is measured while this is off
+    self.forced = False  # Keeps profiling on whether or not the overlay is shown
+    self.per_class = True  # Whether sprite updates are timed per sprite class
+    self.timings = {}  # Seconds spent in each scope this frame
+    self.counters = {}  # Value of each counter this frame
+    self.history = deque(maxlen = history)  # Finished frames, oldest first
+
+  # Turns profiling on for good and keeps every frame from then on, hiding the overlay no longer turns it off
+  def force(self):
+    self.forced = True
+    self.enabled = True
+    if self.history.maxlen is not None:
+      self.history = deque(self.history, maxlen = None)
+
+  # Returns a context manager that times the block under the name
+  def scope(self, name):
+    return Scope(self, name) if self.enabled else NULL_SCOPE
+
+  # Adds time to a named timing of this frame
+  def add_time(self, name, seconds):
+    self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+  # Adds to a named counter of this frame
+  def count(self, name, amount = 1):
+    if self.enabled:
+      self.counters[name] = self.counters.get(name, 0) + amount
+
+  # Updates every sprite of a group, timing the updates per sprite class when profiling
+  def update_group(self, group, *args):
+    if not (self.enabled and self.per_class):
+      group.update(*args)
+      return
+
+    sprites = group.sprites()
+    for sprite in sprites:
+      start = time.perf_counter()
+      sprite.update(*args)
+      self.add_time('update.' + type(sprite).__name__, time.perf_counter() - start)
+    self.count('sprites updated', len(sprites))
+
+  # Stores the timings and counters of the frame that just ended
+  def end_frame(self):
+    if self.enabled:
+      self.history.append({
+        'timings': {name: seconds * 1000 for name, seconds in self.timings.items()},
+        'counters': self.counters
+      })
+    self.timings = {}
+    self.counters = {}
+
+  # Writes the recorded frames to a JSON file, timings in milliseconds
+  def dump_json(self, path):
+    with open(path, 'w') as file:
+      json.dump([dict(frame = index, **frame) for index, frame in enumerate(self.history)], file, indent = 1)
+
+  # Writes the recorded frames to a CSV file, one column per timing and counter
+  def dump_csv(self, path):
+    timing_names = sorted({name for frame in self.history for name in frame['timings']})
+    counter_names = sorted({name for frame in self.history for name in frame['counters']})
+    with open(path, 'w', newline = '') as file:
+      writer = csv.writer(file)
+      writer.writerow(['frame'] + [name + ' (ms)' for name in timing_names] + counter_names)
+      for index, frame in enumerate(self.history):
+        writer.writerow(
+          [index]
+          + [round(frame['timings'].get(name, 0.0), 4) for name in timing_names]
+          + [frame['counters'].get(name, 0) for name in counter_names]
+        )
+
+  # Writes the recorded frames as CSV or JSON depending on the file extension
+  def dump(self, path):
+    if path.endswith('.csv'):
+      self.dump_csv(path)
+    else:
+      self.dump_json(path)
+
+# Profiler shared by the whole game
+profiler = Profiler()
@@ -0,0 +1,51 @@
+from settings import *
+
+# QualityGovernor class for turning costly features off while frames run over budget and back on when there is headroom
+class QualityGovernor:
+  def __init__(self, features = QUALITY_FEATURES):
+    self.features = features  # Features that can be turned off, cheapest to lose first
+    self.budget = None  # Seconds of work a frame may take, None keeps every feature on
+    self.level = 0  # Number of features turned off
+    self.average = 0.0  # Smoothed time spent on the work of a frame
+    self.slow_frames = 0  # Frames in a row over the budget
+    self.fast_frames = 0  # Frames in a row well under the budget
+    self.changed = False  # Whether the level changed on the last update
+
+  # Starts governing frames for a target frame rate, 0 turns the governor off
+  def start(self, fps):
+    self.budget = 1 / fps if fps else None
+    self.level = 0
+    self.average = 0.0
+    self.slow_frames = self.fast_frames = 0
+
+  # Whether a feature is currently on
+  def enabled(self, feature):
+    return feature not in self.features[:self.level]
+
+  # Takes the time the work of the last frame took, and steps the quality down or up when it stays off budget
+  def update(self, seconds):
+    self.changed = False
+    if self.budget is None:
+      return
+
+    self.average += (seconds - self.average) * 0.1
+    if self.average > self.budget * QUALITY_HIGH:
+      self.slow_frames += 1
+      self.fast_frames = 0
+    elif self.average < self.budget * QUALITY_LOW:
+      self.fast_frames += 1
+      self.slow_frames = 0
+    else:
+      self.slow_frames = self.fast_frames = 0
+
+    if self.slow_frames >= QUALITY_DEGRADE_FRAMES and self.level < len(self.features):
+      self.level += 1
+      self.slow_frames = 0
+      self.changed = True
+    elif self.fast_frames >= QUALITY_RESTORE_FRAMES and self.level > 0:
+      self.level -= 1
+      self.fast_frames = 0
+      self.changed = True
+
+# Governor shared by the whole game, it keeps every feature on until the game loop starts it
+quality = QualityGovernor()
@@ -9,3 +9,109 @@ LAYERS = {
   'FG Detail Bottom': 3,  # Foreground detail bottom layer
   'FG Detail Top': 4      # Foreground detail top layer
 }
+
+# Size of the cells used to look up which sprites are on screen
+DRAW_CELL_SIZE = 512
+
+# Size of the cells used to look up which collision tiles are near a rect
+COLLISION_CELL_SIZE = 128
+
+# Size of the pre-rendered chunks of the static tile layers and how many are kept per layer
+CHUNK_SIZE = 512
+CHUNK_CACHE_SIZE = 24
+
+# Folder where compiled levels are cached between runs
+LEVEL_CACHE_DIR = './resources/cache'
+
+# Map the game is played on
+LEVEL_PATH = './resources/data/map.tmx'
+
+# Music streamed from disk while playing
+MUSIC_PATH = './resources/audio/music.wav'
+
+# Sky images drawn behind the level, back to front, and how many times slower than the camera each one scrolls
+SKY_LAYERS = (
+  ('./resources/graphics/sky/bg_sky.png', 2.5),
+  ('./resources/graphics/sky/fg_sky.png', 2)
+)
+
+# Number of threads reading and decoding assets while the loading screen is shown
+LOADER_WORKERS = 4
+
+# Images and image folders packed into the sprite atlas, and the file the packed atlas is cached in
+SPRITE_ATLAS_PATHS = (
+  './resources/graphics/player',
+  './resources/graphics/enemy',
+  './resources/graphics/fire',
+  './resources/graphics/bullet.png',
+  './resources/graphics/health.png'
+)
+SPRITE_ATLAS_CACHE = './resources/cache/sprites.atlas'
+
+# Number of fire animations kept ready to be recycled
+FIRE_POOL_SIZE = 64
+
+# Number of bullets the bullet arrays hold before they grow
+BULLET_CAPACITY = 256
+
+# Length in seconds of one step when the game runs on a fixed timestep
+FIXED_DT = 1 / 60
+
+# Longest distance in pixels a fast mover travels between collision checks, and the most checks per frame
+MAX_STEP_DISTANCE = 32
+MAX_SUBSTEPS = 8
+
+# Speed in pixels per second of the fastest mover, the player's jump, and the longest step that still
+# moves it no further than MAX_STEP_DISTANCE per check. Longer frames, such as after a hitch, are cut to it
+MAX_SPEED = 1400
+MAX_FRAME_DT = MAX_SUBSTEPS * MAX_STEP_DISTANCE / MAX_SPEED
+
+# Number of frames the profiler keeps and the overlay graphs, and the color of each graphed phase
+PROFILER_HISTORY = 600
+PROFILER_GRAPH_FRAMES = 240
+PROFILER_DUMP_PATH = './profile.json'  # File written when F4 is pressed
+PROFILER_PHASES = {
+  'platform_collisions': (80, 200, 255),
+  'update': (120, 255, 120),
+  'bullet_collisions': (255, 220, 80),
+  'draw': (255, 120, 80),
+  'overlay': (220, 120, 255)
+}
+
+# Distance beyond the edges of the camera within which enemies animate and fire
+ENEMY_AWAKE_MARGIN = 256
+
+# Whether only the changed parts of the screen are redrawn while the camera stands still,
+# and how many separate areas can change before the whole screen is redrawn instead
+DIRTY_RECTS = False
+DIRTY_RECT_LIMIT = 24
+
+# Size of the regions the level is streamed in, and how many regions around the player have their
+# enemies instantiated; collision tiles reach one region further so enemies always have a floor
+STREAM_REGION_SIZE = 640
+STREAM_ENEMY_RADIUS = 2
+
+# Frame rate the game loop is capped to (0 for no cap), and whether presenting waits for the display's refresh
+TARGET_FPS = 60
+VSYNC = False
+
+# Features the quality governor turns off, in order, while frames take longer than the budget,
+# and how long the frame time must stay above or below the budget before it steps down or up
+QUALITY_FEATURES = ('far_animation', 'blink', 'parallax')
+QUALITY_HIGH = 0.9  # Share of the frame budget above which a frame counts as slow
+QUALITY_LOW = 0.6  # Share of the frame budget below which a frame counts as fast
+QUALITY_DEGRADE_FRAMES = 30
+QUALITY_RESTORE_FRAMES = 180
+
+# Sounds the audio manager plays: file, volume, and how many copies of the sound can play at once
+AUDIO_SOUNDS = {
+  'shoot': ('./resources/audio/bullet.wav', 1.0, 6),
+  'hit': ('./resources/audio/hit.wav', 0.5, 4)
+}
+
+# Distance from the camera within which sounds play at full volume, and beyond which they are not played
+AUDIO_FULL_VOLUME_DISTANCE = 640
+AUDIO_HEARING_DISTANCE = 1600
+
+# Milliseconds of play between checkpoints, a checkpoint is only taken while the player stands unhurt on the floor
+CHECKPOINT_INTERVAL = 5000
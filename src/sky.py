@@ -0,0 +1,30 @@
+import pygame
+from settings import *
+from assets import load_image
+
+# ParallaxSky class for drawing the sky layers behind the level, each scrolling slower than the camera
+class ParallaxSky:
+  def __init__(self, map_width):
+    self.display_surface = pygame.display.get_surface()
+
+    # Each layer is prepared once and run-length encoded so its transparent pixels cost nothing to blit
+    self.layers = []  # Surface and parallax divisor of each layer, back to front
+    for path, parallax in SKY_LAYERS:
+      surf = load_image(path).copy()
+      surf.set_alpha(255, pygame.RLEACCEL)
+      self.layers.append((surf, parallax))
+
+    # Calculate the number of times the sky image repeats to cover the whole map
+    self.padding = WINDOW_WIDTH / 2
+    self.sky_width = self.layers[0][0].get_width()
+    self.sky_num = int((map_width + 2 * self.padding) // self.sky_width)
+
+  # Draws only the copies of each layer that are inside the window
+  def draw(self, offset):
+    for surf, parallax in self.layers:
+      start_x = -self.padding - offset.x / parallax
+      y = 900 - offset.y / parallax
+      first = max(0, int(-start_x // self.sky_width))
+      last = min(self.sky_num, int((WINDOW_WIDTH - start_x) // self.sky_width) + 1)
+      for x in range(first, last):
+        self.display_surface.blit(surf, (start_x + x * self.sky_width, y))
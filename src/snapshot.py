@@ -0,0 +1,167 @@
+import struct
+import numpy as np
+
+from clock import sim_clock
+from timers import timers
+
+# Compact binary snapshots of everything in the world that changes while playing: the clock, the player,
+# the enemies and regions of the level streamer, the moving platforms and the bullets. Tiles, images and
+# sounds never change, and fire animations are only decoration, so they are left out
+MAGIC = b'CSNP'
+VERSION = 2
+
+# Clock, streamer center and the number of records of each kind that follow
+HEADER = struct.Struct('<4sBd??ii6I')
+REGION = struct.Struct('<ii')  # Key of a loaded region
+ENTITY = struct.Struct('<ddiidd12sd?d?i?i')  # Position, rect, direction, status, frame, duck, health and timers
+PLAYER = struct.Struct('<?i')  # Whether on the floor and index of the platform under the player, -1 for none
+ENEMY = struct.Struct('<Iii')  # Object id and region of a loaded enemy
+SAVED = struct.Struct('<Idii12s')  # Object id, health, position and status of an evicted enemy
+DEAD = struct.Struct('<I')  # Object id of a killed enemy
+PLATFORM = struct.Struct('<ddiiidd')  # Position, rect, previous top, vertical direction and offset along the track
+BULLET_ARRAYS = ('pos', 'velocity', 'start_time', 'flip')
+
+# Returns the state of a player or enemy packed as an ENTITY record
+def pack_entity(entity):
+  return ENTITY.pack(
+    entity.pos.x, entity.pos.y, entity.rect.x, entity.rect.y, entity.direction.x, entity.direction.y,
+    entity.status.encode(), entity.frame_index, entity.duck, entity.health,
+    entity.can_shoot, -1 if entity.shoot_time is None else entity.shoot_time,
+    entity.is_vulnerable, -1 if entity.hit_time is None else entity.hit_time
+  )
+
+# Sets the state of a player or enemy from an ENTITY record, and schedules the timers it was waiting on
+def unpack_entity(entity, data, offset):
+  (x, y, rect_x, rect_y, direction_x, direction_y, status, entity.frame_index, entity.duck, entity.health,
+   entity.can_shoot, shoot_time, entity.is_vulnerable, hit_time) = ENTITY.unpack_from(data, offset)
+
+  entity.pos.update(x, y)
+  entity.rect.topleft = (rect_x, rect_y)
+  entity.direction.update(direction_x, direction_y)
+  entity.status = status.rstrip(b'\0').decode()
+  entity.image = entity.animations[entity.status][int(entity.frame_index)]
+  entity.mask = entity.masks[entity.status][int(entity.frame_index)]
+
+  entity.shoot_time = None if shoot_time == -1 else shoot_time
+  entity.hit_time = None if hit_time == -1 else hit_time
+  if not entity.can_shoot:
+    timers.schedule(entity.shoot_time + entity.cooldown, entity.enable_shooting)
+  if not entity.is_vulnerable:
+    timers.schedule(entity.hit_time + entity.invulnerability_duration, entity.end_invulnerability)
+  return offset + ENTITY.size
+
+# Returns a snapshot of the game's world as bytes
+def capture_snapshot(game):
+  streamer = game.streamer
+  platforms = game.platform_sprites.sprites()
+
+  # Enemies are stored in the order they update in, killed ones that are still loaded count as dead
+  regions = {enemy: (obj_id, key) for key, enemies in streamer.loaded_enemies.items() for obj_id, enemy in enemies}
+  enemies = [(enemy,) + regions[enemy] for enemy in game.enemy_sprites]
+  dead = sorted(streamer.dead_enemies.union(obj_id for enemy, (obj_id, _) in regions.items() if not enemy.alive()))
+  count = game.bullets.count
+
+  parts = [HEADER.pack(
+    MAGIC, VERSION, sim_clock.time, sim_clock.wave, streamer.center is not None, *(streamer.center or (0, 0)),
+    len(streamer.loaded_tiles), len(streamer.loaded_enemies), len(enemies),
+    len(streamer.saved_enemies), len(dead), count
+  )]
+  parts.extend(REGION.pack(*key) for key in sorted(streamer.loaded_tiles))
+  parts.extend(REGION.pack(*key) for key in streamer.loaded_enemies)
+
+  player = game.player
+  parts.append(pack_entity(player))
+  parts.append(PLAYER.pack(player.on_floor, platforms.index(player.moving_floor) if player.moving_floor else -1))
+  for enemy, obj_id, key in enemies:
+    parts.append(ENEMY.pack(obj_id, *key))
+    parts.append(pack_entity(enemy))
+  for obj_id, (health, pos, status) in streamer.saved_enemies.items():
+    parts.append(SAVED.pack(obj_id, health, *pos, status.encode()))
+  parts.extend(DEAD.pack(obj_id) for obj_id in dead)
+
+  for platform in platforms:
+    parts.append(PLATFORM.pack(
+      platform.pos.x, platform.pos.y, *platform.rect.topleft, platform.old_rect.top, platform.direction.y, platform.track.offset
+    ))
+  for name in BULLET_ARRAYS:
+    parts.append(getattr(game.bullets, name)[:count].tobytes())
+  return b''.join(parts)
+
+# Puts the game's world back in the state of a snapshot, reusing the sprites that still exist
+def restore_snapshot(game, data):
+  (magic, version, clock_time, wave, has_center, center_x, center_y,
+   tile_count, region_count, enemy_count, saved_count, dead_count, bullet_count) = HEADER.unpack_from(data)
+  if magic != MAGIC or version != VERSION:
+    raise ValueError(f'not a version {VERSION} world snapshot')
+  offset = HEADER.size
+
+  sim_clock.time = clock_time
+  sim_clock.wave = wave
+  timers.clear()
+
+  # Load exactly the regions that were loaded, the tiles of a region are always created in the same order
+  streamer = game.streamer
+  tile_regions = [REGION.unpack_from(data, offset + index * REGION.size) for index in range(tile_count)]
+  offset += tile_count * REGION.size
+  enemy_regions = [REGION.unpack_from(data, offset + index * REGION.size) for index in range(region_count)]
+  offset += region_count * REGION.size
+  streamer.load_regions(tile_regions)
+  streamer.center = (center_x, center_y) if has_center else None
+
+  platforms = game.platform_sprites.sprites()
+  player = game.player
+  offset = unpack_entity(player, data, offset)
+  player.old_rect = player.rect.copy()
+  player.on_floor, moving_floor = PLAYER.unpack_from(data, offset)
+  player.moving_floor = platforms[moving_floor] if moving_floor >= 0 else None
+  offset += PLAYER.size
+
+  # When the live enemies differ from the snapshot's, every enemy leaves its groups and the ones in the snapshot
+  # join again in their stored order, enemies that were evicted since are created again from their spawn
+  existing = {obj_id: enemy for enemies in streamer.loaded_enemies.values() for obj_id, enemy in enemies}
+  stored = [ENEMY.unpack_from(data, offset + index * (ENEMY.size + ENTITY.size))[0] for index in range(enemy_count)]
+  regroup = [existing.get(obj_id) for obj_id in stored] != game.enemy_sprites.sprites()
+  if regroup:
+    for enemy in game.enemy_sprites.sprites():
+      enemy.kill()
+
+  streamer.loaded_enemies = {key: [] for key in enemy_regions}
+  for _ in range(enemy_count):
+    obj_id, region_x, region_y = ENEMY.unpack_from(data, offset)
+    enemy = existing.get(obj_id)
+    if enemy is None:
+      enemy = streamer.spawn_enemy(obj_id)
+    elif regroup:
+      enemy.add(game.enemy_groups)
+    offset = unpack_entity(enemy, data, offset + ENEMY.size)
+    streamer.loaded_enemies[(region_x, region_y)].append((obj_id, enemy))
+
+  streamer.saved_enemies = {}
+  for _ in range(saved_count):
+    obj_id, health, x, y, status = SAVED.unpack_from(data, offset)
+    streamer.saved_enemies[obj_id] = (health, (x, y), status.rstrip(b'\0').decode())
+    offset += SAVED.size
+  streamer.dead_enemies = {DEAD.unpack_from(data, offset + index * DEAD.size)[0] for index in range(dead_count)}
+  offset += dead_count * DEAD.size
+
+  for platform in platforms:
+    pos_x, pos_y, rect_x, rect_y, old_top, direction_y, platform.track.offset = PLATFORM.unpack_from(data, offset)
+    platform.pos.update(pos_x, pos_y)
+    platform.rect.topleft = (rect_x, rect_y)
+    platform.old_rect.topleft = (rect_x, old_top)
+    platform.direction.y = direction_y
+    offset += PLATFORM.size
+
+  bullets = game.bullets
+  while len(bullets.pos) < bullet_count:
+    bullets.grow()
+  for name in BULLET_ARRAYS:
+    array = getattr(bullets, name)
+    shape = (bullet_count,) + array.shape[1:]
+    values = np.frombuffer(data, array.dtype, int(np.prod(shape)), offset).reshape(shape)
+    array[:bullet_count] = values
+    offset += values.nbytes
+  bullets.count = bullet_count
+
+  for fire in game.effect_sprites.sprites():
+    fire.kill()
@@ -0,0 +1,97 @@
+import pygame
+from settings import *
+from profiler import profiler
+
+# Returns the keys of every cell of a grid with square cells of the size touched by the rect
+def cell_keys(rect, cell_size):
+  left = rect.left // cell_size
+  top = rect.top // cell_size
+  right = (rect.right - 1) // cell_size
+  bottom = (rect.bottom - 1) // cell_size
+  return [(col, row) for row in range(top, bottom + 1) for col in range(left, right + 1)]
+
+# SpatialGrid class for bucketing sprites into fixed-size cells so they can be found by area
+class SpatialGrid:
+  def __init__(self, cell_size = 256):
+    self.cell_size = cell_size  # Width and height of a single cell
+    self.cells = {}  # Sprites stored in each (column, row) cell
+    self.sprite_cells = {}  # Cells covered by each stored sprite
+
+  # Stores a sprite in all the cells its rect covers
+  def add(self, sprite, rect):
+    keys = cell_keys(rect, self.cell_size)
+    self.sprite_cells[sprite] = keys
+    for key in keys:
+      self.cells.setdefault(key, []).append(sprite)
+
+  # Removes a sprite from the cells it was stored in
+  def remove(self, sprite):
+    for key in self.sprite_cells.pop(sprite, ()):
+      cell = self.cells[key]
+      cell.remove(sprite)
+      if not cell:
+        del self.cells[key]
+
+  # Returns the sprites stored in the cells touched by the rect, each one only once
+  def query(self, rect):
+    found = {}
+    for key in cell_keys(rect, self.cell_size):
+      for sprite in self.cells.get(key, ()):
+        found[sprite] = None
+    return list(found)
+
+  def __contains__(self, sprite):
+    return sprite in self.sprite_cells
+
+  def __len__(self):
+    return len(self.sprite_cells)
+
+# CollisionSprites group for finding the collision sprites that touch an area,
+# static tiles are indexed by position without joining the group, moving sprites are members.
+# A moving sprite with an area, the whole area it can ever cover, is indexed by that area instead of checked on every query
+class CollisionSprites(pygame.sprite.Group):
+  def __init__(self, cell_size = COLLISION_CELL_SIZE):
+    super().__init__()
+    self.grid = SpatialGrid(cell_size)  # Static tiles and the areas of moving sprites, indexed by position
+    self.moving = {}  # Moving sprites without an area, checked on every query
+
+  # Indexes a tile that never moves
+  def add_static(self, tile):
+    self.grid.add(tile, tile.rect)
+
+  # Removes a tile added with add_static
+  def remove_static(self, tile):
+    self.grid.remove(tile)
+
+  def add_internal(self, sprite, layer = None):
+    super().add_internal(sprite, layer)
+    if hasattr(sprite, 'area'):
+      self.grid.add(sprite, sprite.area)
+    else:
+      self.moving[sprite] = None
+
+  def remove_internal(self, sprite):
+    super().remove_internal(sprite)
+    if sprite in self.moving:
+      del self.moving[sprite]
+    else:
+      self.grid.remove(sprite)
+
+  # Returns the sprites whose rect collides with the given rect
+  def query(self, rect):
+    candidates = self.grid.query(rect)
+    candidates.extend(self.moving)
+    profiler.count('collision checks', len(candidates))
+    return [sprite for sprite in candidates if sprite.rect.colliderect(rect)]
+
+# Returns the rects with every group of overlapping rects replaced by their union
+def merge_rects(rects):
+  merged = []
+  for rect in rects:
+    rect = pygame.Rect(rect)
+    index = rect.collidelist(merged)
+    while index != -1:
+      rect.union_ip(merged.pop(index))
+      index = rect.collidelist(merged)
+    merged.append(rect)
+  return merged
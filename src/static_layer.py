@@ -0,0 +1,52 @@
+import pygame
+from collections import OrderedDict
+from settings import *
+from profiler import profiler
+from spatial import cell_keys
+
+# StaticLayer class for drawing a tile layer that never changes from pre-rendered chunks
+class StaticLayer:
+  def __init__(self, tiles, z, chunk_size = CHUNK_SIZE, cache_size = CHUNK_CACHE_SIZE):
+    self.z = z  # Layer of the tiles
+    self.chunk_size = chunk_size  # Width and height of a chunk
+    self.cache_size = cache_size  # Number of rendered chunks kept in memory
+
+    # Group the tiles by the chunk they fall in
+    self.chunks = {}
+    for pos, surf in tiles:
+      rect = surf.get_rect(topleft = pos)
+      for key in cell_keys(rect, self.chunk_size):
+        self.chunks.setdefault(key, []).append((pos, surf))
+
+    # Rendered chunks, the least recently drawn one is evicted first
+    self.surfaces = OrderedDict()
+
+  # Renders all the tiles of a chunk onto one surface
+  def render_chunk(self, key):
+    origin = (key[0] * self.chunk_size, key[1] * self.chunk_size)
+    surf = pygame.Surface((self.chunk_size, self.chunk_size), pygame.SRCALPHA).convert_alpha()
+    for pos, tile_surf in self.chunks[key]:
+      surf.blit(tile_surf, (pos[0] - origin[0], pos[1] - origin[1]))
+
+    # Run-length encode the chunk so its transparent areas cost nothing to blit
+    surf.set_alpha(255, pygame.RLEACCEL)
+    return surf
+
+  # Returns the rendered chunk, rendering it first if it is not cached
+  def get_chunk(self, key):
+    if key in self.surfaces:
+      self.surfaces.move_to_end(key)
+    else:
+      self.surfaces[key] = self.render_chunk(key)
+      if len(self.surfaces) > self.cache_size:
+        self.surfaces.popitem(last = False)
+    return self.surfaces[key]
+
+  # Draws the chunks that intersect the camera
+  def draw(self, surface, offset, camera_rect):
+    for key in cell_keys(camera_rect, self.chunk_size):
+      if key in self.chunks:
+        x = key[0] * self.chunk_size - offset.x
+        y = key[1] * self.chunk_size - offset.y
+        surface.blit(self.get_chunk(key), (x, y))
+        profiler.count('blits')
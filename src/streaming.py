@@ -0,0 +1,114 @@
+from settings import *
+
+# LevelStreamer class for keeping only the part of the level around the player instantiated
+class LevelStreamer:
+  def __init__(self, level, create_tile, remove_tile, create_enemy, region_size = STREAM_REGION_SIZE):
+    self.create_tile = create_tile  # Creates a collision tile from a position and surface
+    self.remove_tile = remove_tile  # Removes a collision tile from the game
+    self.create_enemy = create_enemy  # Creates an enemy sprite from a position
+    self.region_size = region_size  # Width and height of a region in pixels
+
+    # Collision tiles and enemy spawns of the whole level, sorted by region
+    self.tiles = {}
+    for x, y, surf in level.tiles('Level'):
+      pos = (x * level.tile_width, y * level.tile_height)
+      self.tiles.setdefault(self.region_of(pos), []).append((pos, surf))
+
+    self.spawns = {}
+    self.spawn_objects = {}  # Spawn of each enemy, by object id
+    for obj in level.objects('Entities'):
+      if obj.name == 'Enemy':
+        self.spawns.setdefault(self.region_of((obj.x, obj.y)), []).append(obj)
+        self.spawn_objects[obj.id] = obj
+
+    # Tiles and enemies of the regions that are loaded
+    self.loaded_tiles = {}
+    self.loaded_enemies = {}
+
+    # State of the enemies of evicted regions, so they come back as they were left
+    self.saved_enemies = {}  # Health, position and status of each evicted enemy, by object id
+    self.dead_enemies = set()  # Ids of the enemies that were killed
+    self.center = None  # Region the player was in on the last update
+
+  # Returns the key of the region containing the position
+  def region_of(self, pos):
+    return (int(pos[0] // self.region_size), int(pos[1] // self.region_size))
+
+  # Returns the keys of the regions within a radius of regions around the center
+  def regions_around(self, center, radius):
+    return {
+      (center[0] + col, center[1] + row)
+      for row in range(-radius, radius + 1)
+      for col in range(-radius, radius + 1)
+    }
+
+  # Creates the collision tiles of a region
+  def load_tiles(self, key):
+    self.loaded_tiles[key] = [self.create_tile(pos, surf) for pos, surf in self.tiles.get(key, ())]
+
+  # Removes the collision tiles of a region
+  def evict_tiles(self, key):
+    for tile in self.loaded_tiles.pop(key):
+      self.remove_tile(tile)
+
+  # Creates the enemies of a region that are still alive, restoring the ones that were evicted
+  def load_enemies(self, key):
+    self.loaded_enemies[key] = []
+    for obj in self.spawns.get(key, ()):
+      if obj.id in self.dead_enemies:
+        continue
+
+      enemy = self.spawn_enemy(obj.id)
+      if obj.id in self.saved_enemies:
+        health, pos, status = self.saved_enemies.pop(obj.id)
+        enemy.health = health
+        enemy.status = status
+        enemy.rect.topleft = pos
+        enemy.pos.update(pos)
+      self.loaded_enemies[key].append((obj.id, enemy))
+
+  # Creates the enemy of a spawn, as it is when it first appears
+  def spawn_enemy(self, obj_id):
+    obj = self.spawn_objects[obj_id]
+    return self.create_enemy((obj.x, obj.y))
+
+  # Removes the enemies of a region, remembering which ones died and how the others were left
+  def evict_enemies(self, key):
+    for obj_id, enemy in self.loaded_enemies.pop(key):
+      if enemy.alive() and enemy.health > 0:
+        self.saved_enemies[obj_id] = (enemy.health, enemy.rect.topleft, enemy.status)
+        enemy.kill()
+      else:
+        self.dead_enemies.add(obj_id)
+
+  # Loads the regions around the position and evicts the far ones, once per region change
+  def update(self, pos):
+    center = self.region_of(pos)
+    if center == self.center:
+      return
+    self.center = center
+
+    # Tiles reach one region further than enemies so every enemy has its floor when it spawns,
+    # and regions are evicted one region further out than they are loaded so they do not flicker
+    tile_regions = self.regions_around(center, STREAM_ENEMY_RADIUS + 1)
+    enemy_regions = self.regions_around(center, STREAM_ENEMY_RADIUS)
+    keep_tiles = self.regions_around(center, STREAM_ENEMY_RADIUS + 2)
+    keep_enemies = self.regions_around(center, STREAM_ENEMY_RADIUS + 1)
+
+    for key in [key for key in self.loaded_enemies if key not in keep_enemies]:
+      self.evict_enemies(key)
+    for key in [key for key in self.loaded_tiles if key not in keep_tiles]:
+      self.evict_tiles(key)
+
+    for key in sorted(tile_regions - self.loaded_tiles.keys()):
+      self.load_tiles(key)
+    for key in sorted(enemy_regions - self.loaded_enemies.keys()):
+      self.load_enemies(key)
+
+  # Loads and evicts the tiles of regions until exactly the given regions are loaded
+  def load_regions(self, keys):
+    keys = set(keys)
+    for key in [key for key in self.loaded_tiles if key not in keys]:
+      self.evict_tiles(key)
+    for key in sorted(keys - self.loaded_tiles.keys()):
+      self.load_tiles(key)
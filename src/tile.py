@@ -1,31 +1,54 @@
 import pygame
 from settings import *
+from clock import sim_clock
+from track import Track
 
-# Tile class for creating and managing a tile
-class Tile(pygame.sprite.Sprite):
-  def __init__(self, pos, surf, groups, z):
-    super().__init__(groups)
+# Tile class for a tile that never moves, kept out of the sprite groups so it carries no per-sprite dict
+class Tile:
+  __slots__ = ('image', 'rect', 'z')
+
+  def __init__(self, pos, surf, z):
     self.image = surf  # Image of the tile
     self.rect = self.image.get_rect(topleft = pos)  # Position of the tile
     self.z = z  # Layer of the tile
 
 # CollisionTile class for creating and managing a collision tile
 class CollisionTile(Tile):
-  def __init__(self, pos, surf, groups):
-    super().__init__(pos, surf, groups, LAYERS['Level'])
-    self.old_rect = self.rect.copy()  # Previous position of the tile
+  __slots__ = ()
+
+  def __init__(self, pos, surf):
+    super().__init__(pos, surf, LAYERS['Level'])
+
+  # Previous position of the tile, always the current one since tiles never move
+  @property
+  def old_rect(self):
+    return self.rect
 
-# MovingPlatform class for creating and managing a moving platform
-class MovingPlatform(CollisionTile):
-  def __init__(self, pos, surf, groups):
-    super().__init__(pos, surf, groups)
+# MovingPlatform class for creating and managing a platform that moves up and down between two borders
+class MovingPlatform(pygame.sprite.Sprite):
+  def __init__(self, pos, surf, groups, borders, level_height):
+    self.image = surf  # Image of the platform
+    self.rect = self.image.get_rect(topleft = pos)  # Position of the platform
+    self.old_rect = self.rect.copy()  # Previous position of the platform
+    self.z = LAYERS['Level']  # Layer of the platform
 
     self.direction = pygame.math.Vector2(0, -1)  # Direction of the platform
     self.speed = 200  # Speed of the platform
     self.pos = pygame.math.Vector2(self.rect.topleft)  # Position of the platform
+    self.track = Track.between(self.rect, borders, self.speed, level_height)  # Path the platform follows
+
+    # Whole area the platform can ever cover, the platform is found by collision queries through it
+    self.area = pygame.Rect(self.rect.x, self.track.top, self.rect.width, self.track.length + self.rect.height)
+    super().__init__(groups)
+
+  # Sends the platform back up from where it is, for when it runs into something from above
+  def turn_up(self):
+    self.pos.y = self.rect.y
+    self.direction.y = -1
+    self.track.set(self.pos.y, -1, sim_clock.time / 1000)
 
-  # Updates the position of the platform
+  # Updates the position of the platform from the simulation time
   def update(self, dt):
     self.old_rect = self.rect.copy()
-    self.pos.y += self.direction.y * self.speed * dt
+    self.pos.y, self.direction.y = self.track.position(sim_clock.time / 1000)
     self.rect.topleft = (round(self.pos.x), round(self.pos.y))
@@ -0,0 +1,31 @@
+import heapq
+
+# TimerScheduler class for calling functions once the simulation clock has passed a given time
+class TimerScheduler:
+  def __init__(self):
+    self.heap = []  # Time, order of scheduling and function of every pending timer, earliest first
+    self.scheduled = 0  # Number of timers ever scheduled, keeps timers due at the same time in order
+
+  # Calls the function on the first update after the time, in milliseconds of the simulation clock
+  def schedule(self, time, callback):
+    heapq.heappush(self.heap, (time, self.scheduled, callback))
+    self.scheduled += 1
+
+  # Calls the functions of the timers that are due, returns how many were called
+  def update(self, now):
+    fired = 0
+    while self.heap and self.heap[0][0] < now:
+      heapq.heappop(self.heap)[2]()
+      fired += 1
+    return fired
+
+  # Drops every pending timer for a new game
+  def clear(self):
+    self.heap.clear()
+    self.scheduled = 0
+
+  def __len__(self):
+    return len(self.heap)
+
+# Timers shared by every object of the running game
+timers = TimerScheduler()
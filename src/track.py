@@ -0,0 +1,41 @@
+# Track class for the path of a moving platform going up and down between two heights,
+# its position is worked out from the simulation time instead of being moved step by step
+class Track:
+  def __init__(self, top, bottom, speed, y, direction):
+    self.top = top  # Highest y the platform's top reaches
+    self.bottom = max(bottom, top)  # Lowest y the platform's top reaches
+    self.speed = speed  # Pixels per second
+    self.offset = 0.0  # Distance along the loop at time zero
+    self.set(y, direction, 0.0)
+
+  # Length of one way of the track
+  @property
+  def length(self):
+    return self.bottom - self.top
+
+  # Returns the y of the platform's top and its vertical direction at a time in seconds.
+  # One loop goes up from the bottom and then down from the top
+  def position(self, time):
+    if self.length <= 0:
+      return self.top, 0
+    distance = (self.offset + self.speed * time) % (2 * self.length)
+    if distance < self.length:
+      return self.bottom - distance, -1
+    return self.top + distance - self.length, 1
+
+  # Shifts the track so that at the time in seconds the platform is at y, going in the direction
+  def set(self, y, direction, time):
+    if self.length <= 0:
+      return
+    y = min(max(y, self.top), self.bottom)
+    distance = self.bottom - y if direction < 0 else self.length + y - self.top
+    self.offset = (distance - self.speed * time) % (2 * self.length)
+
+  # Returns the track of a platform moving between the closest borders above and below it,
+  # the top and bottom of the level stand in for a missing border
+  @classmethod
+  def between(cls, rect, borders, speed, level_height):
+    beside = [border for border in borders if border.left < rect.right and border.right > rect.left]
+    top = max((border.bottom for border in beside if border.bottom <= rect.top), default = 0)
+    bottom = min((border.top for border in beside if border.top >= rect.bottom), default = level_height)
+    return cls(top, bottom - rect.height, speed, rect.y, -1)